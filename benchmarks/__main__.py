@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Run benchmarks of hot paths of the library.
+
+Usage examples:
+
+    python -m benchmarks
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --baseline baseline.json --tolerance 0.2
+    python -m benchmarks --filter context
+
+Exits with non-zero code if any case is slower than its baseline by more than
+given tolerance.
+"""
+
+import argparse
+import sys
+
+from . import (  # NOQA
+    context, executors, histograms, injectors, logger, oid_generators, proxy,
+    records, spans, timing, tracing,
+)
+from .utils import CASES, measure, dump_results, load_results, compare_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        '-o', '--output',
+        help="path to JSON file to save results to")
+    parser.add_argument(
+        '-b', '--baseline',
+        help="path to JSON file with results to compare with")
+    parser.add_argument(
+        '-t', '--tolerance', type=float, default=0.1,
+        help="allowed slowdown relative to baseline (default: %(default)s)")
+    parser.add_argument(
+        '-f', '--filter', default='',
+        help="run only cases which have given substring in their names")
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=5,
+        help="number of repetitions of each case (default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {}
+
+    for name in CASES:
+        if args.filter not in name:
+            continue
+
+        results[name] = measure(name, args.repeat)
+        print("{0:<50}{1:>12.1f} ns".format(name, results[name]))
+
+    if args.output:
+        dump_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare_results(
+            results, load_results(args.baseline), args.tolerance)
+
+        for name, value, expected in regressions:
+            print("Regression: {0}: {1:.1f} ns (baseline: {2:.1f} ns)"
+                  .format(name, value, expected))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
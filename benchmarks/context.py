@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from functools import partial
+
+from isotopic_logging.context import (
+    InjectionContext, static_injector, auto_injector, auto_scope, snapshot,
+    restore,
+)
+from isotopic_logging.injectors import StaticPrefixInjector
+
+from .utils import case
+
+
+injector = StaticPrefixInjector("benchmark")
+outer_scope = partial(static_injector, "operation")
+
+
+@case("context.InjectionContext.top_level")
+def enter_top_level_context():
+    with InjectionContext(injector):
+        pass
+
+
+@case("context.auto_injector.top_level")
+def enter_top_level_auto_injector():
+    with auto_injector():
+        pass
+
+
+@case("context.auto_injector.nested", within=outer_scope)
+def enter_nested_auto_injector():
+    with auto_injector():
+        pass
+
+
+@auto_scope()
+def scoped():
+    pass
+
+
+case("context.auto_scope.top_level")(scoped)
+case("context.auto_scope.nested", within=outer_scope)(scoped)
+
+
+@case("context.static_injector.inherited", within=outer_scope)
+def enter_inherited_static_injector():
+    with static_injector("suboperation", inherit=True):
+        pass
+
+
+@contextmanager
+def deep_scope(depth):
+    if depth:
+        with static_injector("level", inherit=True):
+            with deep_scope(depth - 1):
+                yield
+    else:
+        yield
+
+
+for depth in [1, 16, ]:
+    case("context.snapshot.depth_{0:02d}".format(depth),
+         within=partial(deep_scope, depth))(snapshot)
+
+
+@case("context.restore", within=outer_scope)
+def restore_snapshot():
+    with restore(snapshot()):
+        pass
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from isotopic_logging.context import static_injector
+from isotopic_logging.executors import PropagatingExecutor
+
+from .utils import case
+
+
+executor = ThreadPoolExecutor(max_workers=4)
+propagating = PropagatingExecutor(executor)
+propagating_inherit = PropagatingExecutor(executor, inherit=True)
+outer_scope = partial(static_injector, "operation")
+
+
+def noop():
+    pass
+
+
+def register_case(name, testee, tasks_count=100):
+    tasks = range(tasks_count)
+
+    @case(name, number=200, within=outer_scope)
+    def run_tasks():
+        for future in [testee.submit(noop) for x in tasks]:
+            future.result()
+
+    return run_tasks
+
+
+register_case("executors.ThreadPoolExecutor.100_tasks", executor)
+register_case("executors.PropagatingExecutor.100_tasks", propagating)
+register_case("executors.PropagatingExecutor.inherit.100_tasks",
+              propagating_inherit)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+from isotopic_logging import context
+from isotopic_logging.context import static_injector
+from isotopic_logging.histograms import LatencyHistogram, LatencyRegistry
+
+from .utils import case, threaded_case
+
+
+histogram = LatencyHistogram()
+registry = LatencyRegistry()
+
+
+@contextmanager
+def recording():
+    context.add_listener(registry)
+
+    try:
+        yield
+    finally:
+        context.remove_listener(registry)
+
+
+@case("histograms.LatencyHistogram.record")
+def record():
+    histogram.record(0.012345)
+
+
+@case("histograms.LatencyRegistry.record")
+def record_into_registry():
+    registry.record("Analysis", 0.012345)
+
+
+def enter_scope():
+    with static_injector("Analysis"):
+        pass
+
+
+case("histograms.static_injector.top_level", within=recording)(enter_scope)
+threaded_case("histograms.static_injector.top_level.threads_04", 4,
+              within=recording)(enter_scope)
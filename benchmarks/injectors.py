@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+from isotopic_logging.injectors import (
+    AutoprefixInjector, DirectPrefixInjector, StaticPrefixInjector,
+    merge_injectors,
+)
+
+from .utils import case
+
+
+direct = DirectPrefixInjector("D6EF95 | Communication | ")
+
+
+@case("injectors.DirectPrefixInjector.mark")
+def mark():
+    direct.mark("Connecting to device #3.")
+
+
+def register_merge_case(depth):
+    injectors = [StaticPrefixInjector("phase-{0}".format(i))
+                 for i in range(depth)]
+
+    @case("injectors.merge_injectors.depth_{0:02d}".format(depth))
+    def merge():
+        merge_injectors(*injectors)
+
+    @case("injectors.merge_injectors.compacted.depth_{0:02d}".format(depth))
+    def merge_compacted():
+        merge_injectors(*injectors, max_length=48)
+
+
+for depth in [2, 4, 8, 16, ]:
+    register_merge_case(depth)
+
+
+suboperation = StaticPrefixInjector("suboperation")
+parents = [AutoprefixInjector() for i in range(100000)]
+unique_parents = itertools.cycle(parents)
+
+
+@case("injectors.merge_injectors.same_parent")
+def merge_with_same_parent():
+    merge_injectors(parents[0], suboperation)
+
+
+@case("injectors.merge_injectors.unique_parents")
+def merge_with_unique_parents():
+    merge_injectors(next(unique_parents), suboperation)
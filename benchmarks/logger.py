@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from functools import partial
+
+from isotopic_logging.context import static_injector, auto_scope
+from isotopic_logging.logger import IsotopicLogger
+
+from .utils import case
+
+
+logger = logging.getLogger("isotopic_logging.benchmarks.logger")
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+LOG = IsotopicLogger(logger)
+outer_scope = partial(static_injector, "operation")
+
+
+def log_within_context():
+    with LOG.auto() as log:
+        log.info("message")
+
+
+@auto_scope()
+def log_within_scope():
+    LOG.current.info("message")
+
+
+case("logger.IsotopicLogger.auto.top_level")(log_within_context)
+case("logger.IsotopicLogger.auto.nested",
+     within=outer_scope)(log_within_context)
+case("logger.IsotopicLogger.current.auto_scope.top_level")(log_within_scope)
+case("logger.IsotopicLogger.current.auto_scope.nested",
+     within=outer_scope)(log_within_scope)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Memory consumed by chains of inherited injectors.
+
+Run as ``python -m benchmarks.memory``.
+"""
+
+import tracemalloc
+
+from isotopic_logging.injectors import (
+    AutoprefixInjector, StaticPrefixInjector, RopePrefixInjector,
+    merge_injectors,
+)
+from isotopic_logging.prefix import clear_prefix_caches
+
+
+DEPTHS = [1, 5, 10, 20, ]
+
+# Number of concurrent operations, each of which keeps its own chain
+OPERATIONS_COUNT = 1000
+
+NAME_LENGTH = 40
+
+
+def build_merged_chain(phases):
+    injector = AutoprefixInjector()
+    chain = [injector]
+
+    for phase in phases:
+        injector = merge_injectors(injector, phase)
+        chain.append(injector)
+
+    return chain
+
+
+def build_rope_chain(phases):
+    injector = AutoprefixInjector()
+    chain = [injector]
+
+    for phase in phases:
+        injector = RopePrefixInjector(injector, phase)
+        chain.append(injector)
+
+    # Only the deepest scope logs messages
+    injector.prefix
+    return chain
+
+
+def measure(build, depth):
+    """
+    Get number of bytes allocated per operation to keep its chain of
+    injectors of given depth.
+    """
+    phases = [
+        StaticPrefixInjector("{0:02d}-".format(i).ljust(NAME_LENGTH, "x"))
+        for i in range(depth)
+    ]
+    clear_prefix_caches()
+
+    tracemalloc.start()
+    chains = [build(phases) for i in range(OPERATIONS_COUNT)]
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del chains
+    return size // OPERATIONS_COUNT
+
+
+def main():
+    print("{0:>6}{1:>15}{2:>15}".format("depth", "merged, B", "rope, B"))
+
+    for depth in DEPTHS:
+        print("{0:>6}{1:>15,}{2:>15,}".format(
+            depth,
+            measure(build_merged_chain, depth),
+            measure(build_rope_chain, depth)))
+
+
+if __name__ == '__main__':
+    main()
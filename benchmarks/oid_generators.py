@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Measure throughput of OID generators depending on number of threads.
+
+Usage:
+
+    python -m benchmarks.oid_generators
+"""
+
+from isotopic_logging.concurrency import threadsafe_iter
+from isotopic_logging.generators import (
+    generate_oid, generate_uuid_based_oid, generate_batched_oid,
+    generate_sharded_oid, generate_time_ordered_oid,
+    generate_adaptive_length_oid, generate_snowflake_oid,
+)
+
+from .utils import threaded_case, run_threads
+
+
+GENERATORS = [
+    ("uuid4 + threadsafe_iter", lambda: threadsafe_iter(
+        generate_uuid_based_oid())),
+    ("batched", generate_batched_oid),
+    ("sharded", generate_sharded_oid),
+    ("time-ordered", generate_time_ordered_oid),
+    ("adaptive length", generate_adaptive_length_oid),
+    ("snowflake", lambda: generate_snowflake_oid(node_id=1)),
+]
+
+THREADS_COUNTS = [1, 2, 4, 8, 16, 32, 64, ]
+TOTAL_CALLS = 200000
+
+
+for threads_count in [1, 4, 16, 64, ]:
+    threaded_case(
+        "generators.generate_oid.threads_{0:02d}".format(threads_count),
+        threads_count,
+    )(generate_oid)
+
+
+def measure(generator, threads_count, total_calls=TOTAL_CALLS):
+    elapsed = run_threads(lambda: next(generator), threads_count, total_calls)
+    return total_calls / elapsed
+
+
+def main():
+    print("{0:<25}{1:>8}{2:>15}".format("generator", "threads", "OIDs/sec"))
+
+    for name, factory in GENERATORS:
+        for threads_count in THREADS_COUNTS:
+            rate = measure(factory(), threads_count)
+            print("{0:<25}{1:>8}{2:>15,.0f}".format(name, threads_count, rate))
+
+
+if __name__ == '__main__':
+    main()
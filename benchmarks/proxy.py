@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from isotopic_logging.injectors import StaticPrefixInjector
+from isotopic_logging.proxy import LoggerProxy
+
+from .utils import case
+
+
+logger = logging.getLogger("isotopic_logging.benchmarks")
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+proxy = LoggerProxy(logger, StaticPrefixInjector("benchmark"))
+
+
+@case("proxy.logger.enabled_level")
+def bare_logger_enabled():
+    logger.info("message")
+
+
+@case("proxy.logger.disabled_level")
+def bare_logger_disabled():
+    logger.debug("message")
+
+
+@case("proxy.LoggerProxy.enabled_level")
+def proxy_enabled():
+    proxy.info("message")
+
+
+@case("proxy.LoggerProxy.disabled_level")
+def proxy_disabled():
+    proxy.debug("message")
+
+
+structured_proxy = LoggerProxy(logger, StaticPrefixInjector("benchmark"),
+                               structured=True)
+
+
+@case("proxy.LoggerProxy.structured.enabled_level")
+def structured_proxy_enabled():
+    structured_proxy.info("message")
+
+
+@case("proxy.LoggerProxy.structured.disabled_level")
+def structured_proxy_disabled():
+    structured_proxy.debug("message")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+
+from contextlib import contextmanager
+from functools import partial
+
+from isotopic_logging.context import static_injector, hybrid_injector
+from isotopic_logging.proxy import CurrentLoggerProxy
+from isotopic_logging.records import (
+    IsotopicFilter, install_record_factory, uninstall_record_factory,
+)
+
+from .utils import case
+
+
+def make_logger(name, fmt, filters=()):
+    handler = logging.StreamHandler(open(os.devnull, 'w'))
+    handler.setFormatter(logging.Formatter(fmt))
+
+    for f in filters:
+        handler.addFilter(f)
+
+    logger = logging.getLogger(name)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+proxy_logger = CurrentLoggerProxy(make_logger(
+    "isotopic_logging.benchmarks.records.proxy", "%(message)s"))
+factory_logger = make_logger(
+    "isotopic_logging.benchmarks.records.factory",
+    "%(isotopic_prefix)s%(message)s")
+filter_logger = make_logger(
+    "isotopic_logging.benchmarks.records.filter",
+    "%(isotopic_prefix)s%(message)s", [IsotopicFilter(), ])
+
+outer_scope = partial(hybrid_injector, "operation")
+
+
+@contextmanager
+def scope_with_record_factory():
+    install_record_factory()
+
+    try:
+        with outer_scope():
+            with static_injector("phase", inherit=True):
+                yield
+    finally:
+        uninstall_record_factory()
+
+
+@contextmanager
+def inherited_scope():
+    with outer_scope():
+        with static_injector("phase", inherit=True):
+            yield
+
+
+@case("records.CurrentLoggerProxy.enabled_level", within=inherited_scope)
+def log_via_proxy():
+    proxy_logger.info("message")
+
+
+@case("records.IsotopicFilter.enabled_level", within=inherited_scope)
+def log_via_filter():
+    filter_logger.info("message")
+
+
+@case("records.record_factory.enabled_level",
+      within=scope_with_record_factory)
+def log_via_record_factory():
+    factory_logger.info("message")
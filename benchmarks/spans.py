@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+from isotopic_logging import context
+from isotopic_logging.context import static_injector
+from isotopic_logging.spans import SpanExporter, SpanRecorder
+
+from .utils import case
+
+
+class NullSpanExporter(SpanExporter):
+
+    def export(self, spans):
+        pass
+
+
+@contextmanager
+def recording():
+    recorder = SpanRecorder(NullSpanExporter())
+    context.add_listener(recorder)
+
+    try:
+        yield
+    finally:
+        context.remove_listener(recorder)
+        recorder.shutdown()
+
+
+@case("spans.static_injector.top_level", within=recording)
+def enter_scope():
+    with static_injector("Analysis"):
+        pass
+
+
+@case("spans.static_injector.inherited", within=recording)
+def enter_inherited_scope():
+    with static_injector("Analysis"):
+        with static_injector("Phase", inherit=True):
+            pass
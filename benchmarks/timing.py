@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from isotopic_logging import timing
+from isotopic_logging.defaults import ELAPSED_TIME_FORMAT
+
+from .utils import case
+
+
+DURATION = 5025.67
+
+
+@case("timing.wall_now")
+def wall_now():
+    timing.wall_now()
+
+
+@case("timing.monotonic_now")
+def monotonic_now():
+    timing.monotonic_now()
+
+
+@case("timing.format_duration.strftime")
+def format_by_strftime():
+    dt = datetime.datetime.utcfromtimestamp(DURATION)
+    dt.strftime(ELAPSED_TIME_FORMAT)
+
+
+@case("timing.format_duration")
+def format_duration():
+    timing.format_duration(DURATION)
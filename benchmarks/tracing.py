@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+from isotopic_logging import context
+from isotopic_logging.context import static_injector
+from isotopic_logging.tracing import TraceRecorder
+
+from .utils import case
+
+
+def recording(sample_rate):
+
+    @contextmanager
+    def manager():
+        recorder = TraceRecorder(sample_rate=sample_rate)
+        context.add_listener(recorder)
+
+        try:
+            yield
+        finally:
+            context.remove_listener(recorder)
+
+    return manager
+
+
+def enter_scope():
+    with static_injector("Analysis"):
+        pass
+
+
+for sample_rate in [1.0, 0.1, ]:
+    case("tracing.static_injector.sample_rate_{0}".format(sample_rate),
+         within=recording(sample_rate))(enter_scope)
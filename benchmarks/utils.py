@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import json
+import platform
+import threading
+import time
+import timeit
+
+from collections import OrderedDict
+
+
+# Registry of benchmark cases. Each case is a tuple of a callable, which
+# accepts number of operations to perform and returns time (in seconds) spent
+# to perform them, default number of operations and optional factory of
+# context managers, which are entered before measurement.
+CASES = OrderedDict()
+
+
+def case(name, number=100000, within=None):
+    """
+    Register a function which performs a single operation as a benchmark case.
+    """
+
+    def decorator(func):
+        timer = timeit.Timer(func)
+        CASES[name] = (timer.timeit, number, within)
+        return func
+
+    return decorator
+
+
+def threaded_case(name, threads_count, number=100000, within=None):
+    """
+    Register a function which performs a single operation as a benchmark case
+    which runs the operation in given number of threads.
+    """
+
+    def decorator(func):
+        CASES[name] = (
+            lambda number: run_threads(func, threads_count, number),
+            number,
+            within,
+        )
+        return func
+
+    return decorator
+
+
+def run_threads(func, threads_count, number):
+    """
+    Call given function for ``number`` of times in total from given number of
+    threads and return elapsed time.
+    """
+    calls_per_thread = number // threads_count
+    barrier = threading.Event()
+
+    def worker():
+        barrier.wait()
+
+        for x in range(calls_per_thread):
+            func()
+
+    threads = [threading.Thread(target=worker) for x in range(threads_count)]
+
+    for t in threads:
+        t.start()
+
+    start = time.time()
+    barrier.set()
+
+    for t in threads:
+        t.join()
+
+    elapsed = time.time() - start
+    return elapsed * number / (calls_per_thread * threads_count)
+
+
+def measure(name, repeat=5):
+    """
+    Run a benchmark case and return the best time per operation in
+    nanoseconds.
+    """
+    run, number, within = CASES[name]
+
+    if within is None:
+        elapsed = min(run(number) for x in range(repeat))
+    else:
+        with within():
+            elapsed = min(run(number) for x in range(repeat))
+
+    return elapsed / number * 1e9
+
+
+def dump_results(results, path):
+    data = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': results,
+    }
+
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Return list of tuples ``(name, result, baseline)`` for cases which are
+    slower than their baseline by more than given tolerance.
+    """
+    regressions = []
+
+    for name, value in results.items():
+        expected = baseline.get(name)
+
+        if expected is not None and value > expected * (1 + tolerance):
+            regressions.append((name, value, expected))
+
+    return regressions
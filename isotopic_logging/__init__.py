@@ -2,6 +2,8 @@
 
 from .context import direct_injector, static_injector, auto_injector  # NOQA
 from .context import hybrid_injector  # NOQA
+from .context import direct_scope, static_scope, auto_scope  # NOQA
+from .context import hybrid_scope  # NOQA
 
 # Import renamed factories for compatibility with previous versions
 from .context import static_injector as prefix_injector  # NOQA
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Compaction of prefixes of deeply inherited scopes.
+
+Compacted prefix keeps its first chunk, e.g. the root OID, and its last chunk
+in full, while middle chunks are replaced with short stable digests. If
+digests of separate chunks still exceed the maximal length, the whole middle
+part is replaced with a single digest. First and last chunks are never
+shortened, so prefixes may exceed the maximal length only by them.
+
+Digests of every distinct compacted chain are reported once by a dedicated
+logger, so full prefixes can be reconstructed from logs offline.
+"""
+
+import hashlib
+import json
+import logging
+
+from .defaults import (
+    COMPACTION_DIGEST_LENGTH, COMPACTION_LOGGER, COMPACTION_LEVEL,
+    COMPACTION_REGISTRY_SIZE, PREFIX_CACHE_SIZE, COMPOSED_PREFIX_CACHE_SIZE,
+)
+from .prefix import _cached
+
+
+DIGEST_MARKER = "#"
+
+
+@_cached(PREFIX_CACHE_SIZE)
+def digest_chunk(chunk):
+    """
+    Get short digest of a chunk which does not change between processes.
+    """
+    value = "{0}".format(chunk).encode('utf-8')
+    return DIGEST_MARKER + (
+        hashlib.sha1(value).hexdigest()[:COMPACTION_DIGEST_LENGTH])
+
+
+def _length(chunks, delimiter):
+    return sum(map(len, chunks)) + len(delimiter) * len(chunks)
+
+
+@_cached(COMPOSED_PREFIX_CACHE_SIZE)
+def _compact_middle(middle, delimiter, budget):
+    digests = tuple(digest_chunk(x) for x in middle)
+
+    if _length(digests, delimiter) <= budget or len(digests) == 1:
+        return digests, dict(zip(digests, middle))
+
+    joined = delimiter.join(["{0}".format(x) for x in middle])
+    digest = digest_chunk(joined)
+    return (digest, ), {digest: joined, }
+
+
+# Chains whose digests have been reported. Set is cleared when it grows up to
+# its limit, so chains may be reported again, but memory stays bounded.
+_reported = set()
+
+_logger = logging.getLogger(COMPACTION_LOGGER)
+_level = COMPACTION_LEVEL
+
+
+def set_compaction_logger(logger=None, level=None):
+    """
+    Set logger and level used to report digests of compacted chains.
+    """
+    global _logger, _level
+
+    _logger = logger or logging.getLogger(COMPACTION_LOGGER)
+    _level = COMPACTION_LEVEL if level is None else level
+
+
+def forget_reported_chains():
+    _reported.clear()
+
+
+def _report(digests, mapping):
+    if digests in _reported:
+        return
+
+    if len(_reported) >= COMPACTION_REGISTRY_SIZE:
+        _reported.clear()
+
+    _reported.add(digests)
+
+    _logger.log(
+        _level,
+        "Prefix digests: {0}".format(json.dumps(mapping, sort_keys=True)),
+        extra={'isotopic_digests': mapping, })
+
+
+def compact_chunks(chunks, delimiter, max_length):
+    """
+    Get chunks of a prefix which fits into given length, if possible.
+
+    Digests which are used for the first time are reported.
+    """
+    if len(chunks) < 3 or _length(chunks, delimiter) <= max_length:
+        return chunks
+
+    first, last = chunks[0], chunks[-1]
+    budget = max_length - _length((first, last), delimiter)
+    digests, mapping = _compact_middle(tuple(chunks[1:-1]), delimiter, budget)
+    _report(digests, mapping)
+
+    return (first, ) + digests + (last, )
+
+
+def compact_prefix(chunks, delimiter, max_length):
+    return (
+        delimiter.join(compact_chunks(chunks, delimiter, max_length)) +
+        delimiter)
@@ -1,17 +1,53 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
 import threading
+import weakref
+
+try:
+    from collections.abc import Coroutine
+except ImportError:
+    # Python 2
+    Coroutine = None
+
+
+_fork_sensitive_objects = weakref.WeakSet()
+
+
+def register_after_fork(obj):
+    """
+    Register object which must be reinitialized within child process after
+    fork. Object must implement ``_after_fork`` method, which is called
+    without arguments.
+
+    Registration has effect only if ``os.register_at_fork`` is available.
+    """
+    _fork_sensitive_objects.add(obj)
+
+
+def _after_fork_in_child():
+    for obj in list(_fork_sensitive_objects):
+        obj._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 
 class threadsafe_iter(object):
     """
     Takes an iterator/generator and makes it thread-safe by serializing call to
     the ``next`` method of given iterator/generator.
+
+    Lock is recreated in child processes after fork, so they will not deadlock
+    if fork happens while the lock is held by another thread.
     """
 
     def __init__(self, original):
         self.original = original
         self.lock = threading.Lock()
+        register_after_fork(self)
 
     def __iter__(self):
         return self
@@ -22,3 +58,93 @@ class threadsafe_iter(object):
 
     # Python 3 compatibility
     next = __next__
+
+    def _after_fork(self):
+        self.lock = threading.Lock()
+
+
+class completed(object):
+    """
+    Awaitable which is immediately resolved into given value.
+
+    Allows to implement asynchronous protocols (e.g., ``__aenter__``) without
+    syntax which is unsupported by older versions of Python.
+    """
+
+    __slots__ = ['value', ]
+
+    def __init__(self, value):
+        self.value = value
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raise StopIteration(self.value)
+
+    # Python 3 compatibility
+    next = __next__
+
+
+class scoped_coroutine(object):
+    """
+    Coroutine which runs given coroutine within given context manager.
+
+    Context is entered when the coroutine is started and exited when it
+    finishes, so every step of the coroutine runs within the context. Allows
+    to decorate coroutine functions without syntax which is unsupported by
+    older versions of Python.
+
+    Context is not exited if the coroutine is closed before it finishes,
+    because closing may happen outside of the task which runs it.
+    """
+
+    __slots__ = ['coroutine', 'context', '_iterator', '_entered', ]
+
+    def __init__(self, coroutine, context):
+        self.coroutine = coroutine
+        self.context = context
+        self._iterator = coroutine.__await__()
+        self._entered = False
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    # Python 3 compatibility
+    next = __next__
+
+    def send(self, value):
+        return self._step(self._iterator.send, value)
+
+    def throw(self, *args):
+        return self._step(self._iterator.throw, *args)
+
+    def close(self):
+        self._iterator.close()
+
+    def _step(self, method, *args):
+        if not self._entered:
+            self.context.__enter__()
+            self._entered = True
+
+        try:
+            return method(*args)
+        except StopIteration:
+            self.context.__exit__(None, None, None)
+            raise
+        except BaseException:
+            self.context.__exit__(*sys.exc_info())
+            raise
+
+
+if Coroutine is not None:
+    Coroutine.register(scoped_coroutine)
@@ -1,102 +1,561 @@
 # -*- coding: utf-8 -*-
 
-import time
+import inspect
+import logging
 import threading
+import warnings
 
-from collections import deque, namedtuple
+from collections import namedtuple
+from functools import wraps
 
+try:
+    import contextvars
+except ImportError:
+    # Python < 3.7
+    contextvars = None
+
+from . import timing
+from .concurrency import completed, scoped_coroutine
+from .defaults import SLOW_SCOPE_THRESHOLD, SLOW_SCOPE_LOGGER, SLOW_SCOPE_LEVEL
 from .injectors import (
     DirectPrefixInjector, StaticPrefixInjector, AutoprefixInjector,
     HybridPrefixInjector,
 )
-from .injectors import merge_injectors
+from .injectors import inherit_injector
 
 
-StackItem = namedtuple('StackItem', ('injector', 'parent', ))
+# Item of injection stack keeps an injector, a scope which has pushed it and
+# owner which has pushed it: asyncio task or thread if no task is running
+StackItem = namedtuple('StackItem', ('injector', 'parent', 'owner', ))
 
 
-class InjectionLocalStack(threading.local):
+class InjectionStackLeakWarning(RuntimeWarning):
+    """
+    Warning which is issued when depth of injection stack reaches threshold
+    set by `detect_stack_leaks`.
+    """
+
+
+_leak_threshold = None
+_leak_callback = None
+
+
+def detect_stack_leaks(threshold, callback=None):
+    """
+    Report injection stacks which grow up to given depth.
+
+    Each time depth of a stack reaches ``threshold``, ``callback`` is called
+    with the depth and a list of stack items ordered from bottom to top. By
+    default, `InjectionStackLeakWarning` is issued. Passing ``None`` as
+    ``threshold`` disables detection.
+    """
+    global _leak_threshold, _leak_callback
+
+    _leak_threshold = threshold
+    _leak_callback = callback or warn_about_stack_leak
 
-    def __init__(self):
-        self._container = deque()
-        super(InjectionLocalStack, self).__init__()
+
+def warn_about_stack_leak(depth, items):
+    message = (
+        "Injection stack has reached depth {0}, scopes may be leaking: {1}"
+        .format(depth, items))
+    warnings.warn(message, InjectionStackLeakWarning, stacklevel=4)
+
+
+class LinkedStackMixin(object):
+    """
+    Operations of a stack which is stored as an immutable linked list in
+    ``head`` attribute. Nodes of the list are tuples
+    ``(item, node_below, depth)`` and empty stack is represented by ``None``.
+
+    As nodes are never modified, state of a stack can be captured by taking
+    a reference to its head, regardless of the stack depth.
+    """
 
     def push(self, item):
-        self._container.append(item)
+        head = self.head
+        depth = 1 if head is None else head[2] + 1
+        self.head = (item, head, depth)
+
+        if depth == _leak_threshold:
+            _leak_callback(depth, self.items)
 
     def pop(self):
-        return self._container.pop()
+        head = self.head
+
+        if head is None:
+            raise IndexError("pop from an empty stack")
+
+        self.head = head[1]
+        return head[0]
 
     @property
     def top(self):
-        try:
-            return self._container[-1]
-        except IndexError:
-            return None
+        head = self.head
+        return None if head is None else head[0]
 
     @property
     def is_empty(self):
-        return not self._container
+        return self.head is None
+
+    @property
+    def depth(self):
+        head = self.head
+        return 0 if head is None else head[2]
+
+    @property
+    def items(self):
+        """
+        List of stack items ordered from bottom to top.
+        """
+        items = []
+        node = self.head
+
+        while node is not None:
+            items.append(node[0])
+            node = node[1]
+
+        items.reverse()
+        return items
+
+
+class InjectionLocalStack(LinkedStackMixin, threading.local):
+
+    def __init__(self):
+        self.head = None
+        super(InjectionLocalStack, self).__init__()
+
+
+class InjectionContextStack(LinkedStackMixin):
+    """
+    Stack which is backed by a context variable.
+
+    Every thread and every asyncio task has own view of the stack. Tasks
+    inherit stack which was current at the moment of their creation, but their
+    changes of the stack are invisible to other tasks.
+    """
+
+    def __init__(self):
+        self._var = contextvars.ContextVar('isotopic_logging_stack',
+                                           default=None)
+
+    @property
+    def head(self):
+        return self._var.get()
+
+    @head.setter
+    def head(self, value):
+        self._var.set(value)
+
+
+if contextvars is None:
+    _stack = InjectionLocalStack()
+
+    def current_owner():
+        """
+        Get thread which is running, as stacks of threads are not shared.
+        """
+        return threading.current_thread()
+else:
+    _stack = InjectionContextStack()
+
+    import asyncio
+
+    def current_owner():
+        """
+        Get asyncio task which is running in current thread or the thread
+        itself if no task is running.
+
+        Stacks are shared by tasks and threads which run in copies of the same
+        context, so owners tell them apart.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return threading.current_thread()
+
+        return asyncio.current_task() or threading.current_thread()
+
+
+class ScopeListener(object):
+    """
+    Base class for objects which are notified about entrance into injection
+    contexts and exit from them.
+
+    Listeners receive the context and its injector. Time of entrance into the
+    scope is available as ``enter_time`` of the injector within both calls.
+    """
+
+    def scope_entered(self, context, injector):
+        pass
+
+    def scope_exited(self, context, injector, exc_type):
+        pass
+
+
+# Tuple is replaced on every change, so it can be iterated without locks
+_listeners = ()
+_listeners_lock = threading.Lock()
+
+_slow_scope_threshold = SLOW_SCOPE_THRESHOLD
+_slow_scope_logger = logging.getLogger(SLOW_SCOPE_LOGGER)
+_slow_scope_level = SLOW_SCOPE_LEVEL
+
+# Tells whether scopes have to be tracked even if they are nested
+_tracking = _slow_scope_threshold is not None
+
+
+def _update_tracking():
+    global _tracking
+    _tracking = bool(_listeners) or _slow_scope_threshold is not None
+
+
+def add_listener(listener):
+    global _listeners
+
+    with _listeners_lock:
+        _listeners = _listeners + (listener, )
+        _update_tracking()
+
+
+def remove_listener(listener):
+    global _listeners
+
+    with _listeners_lock:
+        _listeners = tuple(x for x in _listeners if x is not listener)
+        _update_tracking()
+
+
+def set_slow_scope_threshold(threshold, logger=None, level=None):
+    """
+    Set default threshold (in seconds) of duration of injection scopes.
+
+    Scopes which take longer are reported on exit by given logger with given
+    level. Passing ``None`` as ``threshold`` disables detection for scopes
+    which have no own threshold. Default is applied to contexts at the
+    moment of their creation.
+    """
+    global _slow_scope_threshold, _slow_scope_logger, _slow_scope_level
+
+    _slow_scope_threshold = threshold
+    _slow_scope_logger = logger or logging.getLogger(SLOW_SCOPE_LOGGER)
+    _slow_scope_level = SLOW_SCOPE_LEVEL if level is None else level
+    _update_tracking()
+
+
+def _report_slow_scope(context, injector, elapsed):
+    logger = context.slow_scope_logger or _slow_scope_logger
+    name = "" if context.name is None else " '{0}'".format(context.name)
+
+    message = (
+        "Slow scope{name} took {elapsed} (threshold: {threshold}s)"
+        .format(name=name,
+                elapsed=timing.format_duration(elapsed),
+                threshold=context.threshold))
 
+    if not context.slow_scope_structured:
+        logger.log(_slow_scope_level, injector.mark(message))
+        return
 
-_stack = InjectionLocalStack()
+    # Records import this module, so they are imported on demand
+    from .records import is_record_factory_installed
+
+    if is_record_factory_installed():
+        # Factory attaches fields of current injector, i.e. of this one
+        logger.log(_slow_scope_level, message)
+    else:
+        logger.log(_slow_scope_level, message, extra=injector.fields)
 
 
 class InjectionContext(object):
+    """
+    Context manager which defines injection scope.
+
+    New injector is pushed to the stack only when context is entered and
+    either the stack is empty or prefix of current scope is inherited.
+    Otherwise, injector of current scope is reused. If it has been pushed by
+    another asyncio task or thread, e.g. by a parent task or by a thread
+    whose context has been copied, scope pushes own copy of it, so tasks and
+    threads do not share time tracking.
+
+    Optional ``name`` identifies kind of scope for listeners, e.g. for
+    aggregation of statistics.
+
+    If scope lasts longer than ``threshold`` seconds, it is reported on exit
+    by ``slow_scope_logger`` or by logger set via
+    `set_slow_scope_threshold`, which also sets default threshold. If
+    ``slow_scope_structured`` is set, fields of prefix are passed as ``extra``
+    fields of the report instead of injecting prefix into its message.
+
+    If ``max_length`` is given, inherited prefix is compacted to fit into it.
+    """
+
+    # Span record attached by span recorder, if any
+    span = None
+
+    # Key of sampling of the operation attached by trace recorder, if any
+    trace_key = None
+
+    def __init__(self, injector, inherit=False, name=None, threshold=None,
+                 max_length=None):
+        self.injector = injector
+        self.inherit = inherit
+        self.name = name
+        self.threshold = (
+            _slow_scope_threshold if threshold is None else threshold)
+        self.max_length = max_length
+        self.slow_scope_logger = None
+        self.slow_scope_structured = False
+        self._item = None
+        self._pushed = False
+        self._old_enter_time = None
 
-    _old_enter_time = None
+    def __enter__(self):
+        item = _stack.top
+        owner = current_owner()
 
-    def __init__(self, injector, inherit=False):
-        if _stack.is_empty:
-            if callable(injector):
-                injector = injector()
+        if item is None or self.inherit:
+            injector = self.injector
 
-            self._push(injector)
-        elif inherit:
             if callable(injector):
                 injector = injector()
 
-            injector = merge_injectors(_stack.top.injector, injector)
-            self._push(injector)
+            if item is not None:
+                injector = inherit_injector(item.injector, injector,
+                                            self.max_length)
+
+            item = StackItem(injector, self, owner)
+            _stack.push(item)
+            self._pushed = True
+        elif item.owner is not owner:
+            # Injector of current scope is shared with another owner, so scope
+            # gets own copy of it to track own time. Item keeps the scope
+            # which has defined the prefix.
+            item = StackItem(_copy_injector(item.injector), item.parent,
+                             owner)
+            _stack.push(item)
+            self._pushed = True
+        else:
+            self._pushed = False
+
+        self._item = item
 
-    def _push(self, injector):
-        item = StackItem(injector, self)
-        _stack.push(item)
+        inj = item.injector
+        self._old_enter_time, inj.enter_time = inj.enter_time, timing.now()
+
+        for listener in _listeners:
+            listener.scope_entered(self, inj)
 
-    def __enter__(self):
-        inj = _stack.top.injector
-        self._old_enter_time, inj.enter_time = inj.enter_time, time.time()
         return inj
 
     def __exit__(self, exc_type, value, traceback):
-        item = _stack.top
-
+        item, self._item = self._item, None
         inj = item.injector
+
+        for listener in _listeners:
+            listener.scope_exited(self, inj, exc_type)
+
+        if self.threshold is not None:
+            elapsed = timing.elapsed(inj.enter_time)
+
+            if elapsed > self.threshold:
+                _report_slow_scope(self, inj, elapsed)
+
         inj.enter_time, self._old_enter_time = self._old_enter_time, None
 
-        if item.parent is self:
+        if self._pushed:
             _stack.pop()
 
+    def __aenter__(self):
+        return completed(self.__enter__())
+
+    def __aexit__(self, exc_type, value, traceback):
+        return completed(self.__exit__(exc_type, value, traceback))
+
+
+def _copy_injector(injector):
+    return DirectPrefixInjector(injector.prefix, injector.chunks,
+                                injector.delimiter, injector.oid)
+
+
+def snapshot():
+    """
+    Capture current state of injection stack.
+
+    Capturing costs the same regardless of the stack depth. Result can be
+    passed to another thread or task and made current there via `restore`.
+    """
+    return _stack.head
+
+
+class restore(object):
+    """
+    Context manager which makes given snapshot of injection stack current
+    within its scope.
+
+    If snapshot is not empty, its current injector is reused by a new scope
+    with own injector and own time tracking, so scopes in different threads do
+    not interfere with each other.
+
+    Span of the scope which was current at the moment of snapshot creation is
+    passed to the restored scope, so spans of nested scopes can refer to it.
+    Key of sampling of traces is passed in the same way.
+    """
+
+    span = None
+    trace_key = None
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._previous = None
+
+    def __enter__(self):
+        self._previous, _stack.head = _stack.head, self.snapshot
+
+        if self.snapshot is None:
+            return None
+
+        item = self.snapshot[0]
+        self.span = getattr(item.parent, 'span', None)
+        self.trace_key = getattr(item.parent, 'trace_key', None)
+
+        injector = _copy_injector(item.injector)
+        injector.enter_time = timing.now()
+        _stack.push(StackItem(injector, self, current_owner()))
+
+        return injector
+
+    def __exit__(self, exc_type, value, traceback):
+        _stack.head, self._previous = self._previous, None
 
-def direct_injector(prefix, inherit=False):
+    def __aenter__(self):
+        return completed(self.__enter__())
+
+    def __aexit__(self, exc_type, value, traceback):
+        return completed(self.__exit__(exc_type, value, traceback))
+
+
+def direct_injector(prefix, inherit=False, threshold=None, max_length=None):
     return InjectionContext(
         lambda: DirectPrefixInjector(prefix),
-        inherit)
+        inherit, None, threshold, max_length)
 
 
-def static_injector(prefix, delimiter=None, inherit=False):
+def static_injector(prefix, delimiter=None, inherit=False, threshold=None,
+                    max_length=None):
     return InjectionContext(
         lambda: StaticPrefixInjector(prefix, delimiter),
-        inherit)
+        inherit, prefix, threshold, max_length)
 
 
-def auto_injector(oid_generator=None, delimiter=None, inherit=False):
+def auto_injector(oid_generator=None, delimiter=None, inherit=False,
+                  threshold=None, max_length=None):
     return InjectionContext(
         lambda: AutoprefixInjector(oid_generator, delimiter),
-        inherit)
+        inherit, None, threshold, max_length)
 
 
-def hybrid_injector(prefix, oid_generator=None, delimiter=None, inherit=False):
+def hybrid_injector(prefix, oid_generator=None, delimiter=None, inherit=False,
+                    threshold=None, max_length=None):
     return InjectionContext(
         lambda: HybridPrefixInjector(prefix, oid_generator, delimiter),
-        inherit)
+        inherit, prefix, threshold, max_length)
+
+
+class InjectionScope(object):
+    """
+    Decorator which runs functions within injection scope.
+
+    Unlike injection contexts, scopes are built once at decoration time. If a
+    decorated function is called within another scope of the same task or
+    thread, does not inherit its prefix and scopes are not tracked by
+    listeners or thresholds, the call costs only a check of the stack and a
+    read of time.
+
+    Coroutine functions are run within the scope from start to finish rather
+    than only while their coroutines are created.
+    """
+
+    def __init__(self, injector, inherit=False, name=None, threshold=None,
+                 max_length=None):
+        self.injector = injector
+        self.inherit = inherit
+        self.name = name
+        self.threshold = threshold
+        self.max_length = max_length
+
+    def __call__(self, fn):
+        if _is_coroutine_function(fn):
+            return self._wrap_coroutine_function(fn)
+
+        injector, inherit, name = self.injector, self.inherit, self.name
+        threshold, max_length = self.threshold, self.max_length
+        simple = not inherit and threshold is None
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            item = _stack.top
+
+            if (item is None or not simple or _tracking or
+                    item.owner is not current_owner()):
+                with InjectionContext(injector, inherit, name, threshold,
+                                      max_length):
+                    return fn(*args, **kwargs)
+
+            inj = item.injector
+            old_enter_time, inj.enter_time = inj.enter_time, timing.now()
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                inj.enter_time = old_enter_time
+
+        return wrapper
+
+    def _wrap_coroutine_function(self, fn):
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            context = InjectionContext(self.injector, self.inherit, self.name,
+                                       self.threshold, self.max_length)
+            return scoped_coroutine(fn(*args, **kwargs), context)
+
+        if _mark_coroutine_function is not None:
+            wrapper = _mark_coroutine_function(wrapper)
+
+        return wrapper
+
+
+# Python < 3.5 has no coroutine functions
+_is_coroutine_function = getattr(
+    inspect, 'iscoroutinefunction', lambda fn: False)
+
+# Python < 3.12 cannot mark functions which return coroutines
+_mark_coroutine_function = getattr(inspect, 'markcoroutinefunction', None)
+
+
+def direct_scope(prefix, inherit=False, threshold=None, max_length=None):
+    return InjectionScope(
+        lambda: DirectPrefixInjector(prefix),
+        inherit, None, threshold, max_length)
+
+
+def static_scope(prefix, delimiter=None, inherit=False, threshold=None,
+                 max_length=None):
+    return InjectionScope(
+        lambda: StaticPrefixInjector(prefix, delimiter),
+        inherit, prefix, threshold, max_length)
+
+
+def auto_scope(oid_generator=None, delimiter=None, inherit=False,
+               threshold=None, max_length=None):
+    return InjectionScope(
+        lambda: AutoprefixInjector(oid_generator, delimiter),
+        inherit, None, threshold, max_length)
+
+
+def hybrid_scope(prefix, oid_generator=None, delimiter=None, inherit=False,
+                 threshold=None, max_length=None):
+    return InjectionScope(
+        lambda: HybridPrefixInjector(prefix, oid_generator, delimiter),
+        inherit, prefix, threshold, max_length)
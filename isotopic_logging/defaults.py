@@ -1,8 +1,93 @@
 # -*- coding: utf-8 -*-
 
+import logging
+
 OID_LENGTH = 6
 OID_MAX_LENGTH = 32
 
+# Number of OIDs produced per single request for entropy by batched generator
+OID_BATCH_SIZE = 1024
+
+# Crockford's Base32 alphabet used by generators which encode numbers
+OID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Length of OIDs (without process tags), of shard tags and of process tags
+# produced by sharded generator. Default lengths give 1024 shards of 32 ** 8
+# OIDs each, so a process runs out of them after 35 years of generating a
+# million of OIDs per second. Process tags fit IDs below 2 ** 25.
+OID_SHARDED_LENGTH = 10
+OID_SHARD_LENGTH = 2
+OID_SHARD_PROCESS_LENGTH = 5
+
+# Length and resolution (in seconds) of timestamps of time-ordered OIDs
+OID_TIMESTAMP_LENGTH = 9
+OID_TIMESTAMP_RESOLUTION = 0.001
+
+# Number of recent OIDs which are guaranteed not to repeat by unique generator
+OID_UNIQUENESS_WINDOW = 10000
+OID_UNIQUENESS_MAX_ATTEMPTS = 100
+
+# Parameters of adaptive-length generator: minimal length of OIDs, duration of
+# observation window (in seconds) and target probability of a collision
+# within the window
+OID_ADAPTIVE_MIN_LENGTH = 4
+OID_ADAPTIVE_WINDOW = 60
+OID_COLLISION_PROBABILITY = 0.001
+
+# Length of tags of processes mixed into OIDs by process-tagged generator
+OID_PROCESS_TAG_LENGTH = 3
+
+# Lengths of node, process and counter parts of OIDs produced by snowflake
+# generator. Process part fits IDs below 2 ** 25.
+OID_NODE_LENGTH = 2
+OID_SNOWFLAKE_PROCESS_LENGTH = 5
+OID_COUNTER_LENGTH = 5
+
 DELIMITER = " | "
 
+# Maximal numbers of static prefix fragments with applied delimiters and of
+# composed prefixes of inherited scopes which are kept in caches
+PREFIX_CACHE_SIZE = 1024
+COMPOSED_PREFIX_CACHE_SIZE = 4096
+
+# Middle chunks of compacted prefixes are replaced with digests of given number
+# of hex digits. Digests of every distinct compacted chain are reported once by
+# logger with given name and level, until registry of reported chains reaches
+# given size and is cleared.
+COMPACTION_DIGEST_LENGTH = 6
+COMPACTION_LOGGER = "isotopic_logging.compaction"
+COMPACTION_LEVEL = logging.INFO
+COMPACTION_REGISTRY_SIZE = 4096
+
 ELAPSED_TIME_FORMAT = "%H:%M:%S.%f"
+
+# Latency histograms count durations in microseconds exactly up to
+# 2 ** HISTOGRAM_PRECISION, larger values fall into buckets with relative
+# width of 2 ** -(HISTOGRAM_PRECISION - 1). Values above HISTOGRAM_MAX_VALUE
+# (about 12 days) are clamped.
+HISTOGRAM_PRECISION = 6
+HISTOGRAM_MAX_VALUE = 2 ** 40
+
+# Percentiles reported by latency registries
+HISTOGRAM_PERCENTILES = (50, 95, 99, )
+
+# Number of events kept by trace recorders and share of operations which are
+# traced
+TRACE_BUFFER_SIZE = 65536
+TRACE_SAMPLE_RATE = 1.0
+
+# Span recorders export spans by batches of given size at least once per given
+# interval (in seconds). Spans which do not fit into the queue are dropped.
+SPAN_BATCH_SIZE = 512
+SPAN_EXPORT_INTERVAL = 1.0
+SPAN_QUEUE_SIZE = 65536
+
+# Default threshold (in seconds) of duration of slow scopes, `None` disables
+# detection. Slow scopes are reported by logger with given name and level
+# unless another logger is given.
+SLOW_SCOPE_THRESHOLD = None
+SLOW_SCOPE_LOGGER = "isotopic_logging.slow_scopes"
+SLOW_SCOPE_LEVEL = logging.WARNING
+
+# Clock used to track time within injection scopes: "wall" or "monotonic"
+TIMING_MODE = "wall"
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import Executor
+
+from .context import auto_injector, snapshot, restore
+
+
+def _run_within(state, inherit, oid_generator, delimiter, fn, args, kwargs):
+    with restore(state):
+        if not inherit:
+            return fn(*args, **kwargs)
+
+        with auto_injector(oid_generator, delimiter, inherit=True):
+            return fn(*args, **kwargs)
+
+
+class PropagatingExecutor(Executor):
+    """
+    Wrapper for executors which runs submitted callables within injection scope
+    which was current at the moment of submission.
+
+    Scope is captured as a snapshot of injection stack, which costs the same
+    regardless of the stack depth and does not take any locks. If ``inherit``
+    is set, every callable gets own autogenerated prefix inherited from the
+    captured one.
+
+    Snapshots are not picklable, so wrapped executor must run callables within
+    current process, e.g., it can be an instance of ``ThreadPoolExecutor``.
+    """
+
+    def __init__(self, executor, inherit=False, oid_generator=None,
+                 delimiter=None):
+        self._executor = executor
+        self._inherit = inherit
+        self._oid_generator = oid_generator
+        self._delimiter = delimiter
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(
+            _run_within, snapshot(), self._inherit, self._oid_generator,
+            self._delimiter, fn, args, kwargs)
+
+    def shutdown(self, wait=True, **kwargs):
+        self._executor.shutdown(wait, **kwargs)
@@ -1,9 +1,53 @@
 # -*- coding: utf-8 -*-
 
+import binascii
+import itertools
+import math
+import os
+import random
+import threading
+import time
 import uuid
+import weakref
 
-from .defaults import OID_LENGTH, OID_MAX_LENGTH
-from .concurrency import threadsafe_iter
+from collections import deque
+
+from .concurrency import register_after_fork
+from .defaults import (
+    OID_LENGTH, OID_MAX_LENGTH, OID_BATCH_SIZE, OID_ALPHABET,
+    OID_SHARDED_LENGTH, OID_SHARD_LENGTH, OID_SHARD_PROCESS_LENGTH,
+    OID_TIMESTAMP_LENGTH, OID_TIMESTAMP_RESOLUTION, OID_UNIQUENESS_WINDOW,
+    OID_UNIQUENESS_MAX_ATTEMPTS, OID_ADAPTIVE_MIN_LENGTH, OID_ADAPTIVE_WINDOW,
+    OID_COLLISION_PROBABILITY, OID_PROCESS_TAG_LENGTH, OID_NODE_LENGTH,
+    OID_SNOWFLAKE_PROCESS_LENGTH, OID_COUNTER_LENGTH,
+)
+
+
+def _encode(number, width):
+    """
+    Encode non-negative integer as a string of given width using OID alphabet.
+    """
+    base = len(OID_ALPHABET)
+    chars = []
+
+    for x in range(width):
+        number, index = divmod(number, base)
+        chars.append(OID_ALPHABET[index])
+
+    return ''.join(reversed(chars))
+
+
+def _decode(string):
+    """
+    Decode integer from a string produced by `_encode`.
+    """
+    base = len(OID_ALPHABET)
+    number = 0
+
+    for char in string:
+        number = number * base + OID_ALPHABET.index(char)
+
+    return number
 
 
 def generate_uuid_based_oid(length=None):
@@ -16,8 +60,538 @@ def generate_uuid_based_oid(length=None):
         yield uuid.uuid4().hex.upper()[:length]
 
 
-generate_default_oid = generate_uuid_based_oid
-default_oid_generator = threadsafe_iter(generate_default_oid())
+class BatchedOIDGenerator(object):
+    """
+    OID generator which requests entropy from ``os.urandom`` in large blocks
+    and hex-encodes them in bulk.
+
+    Results are handed out from per-thread buffers, so generator is threadsafe
+    and does not take any locks. Buffers are dropped in child processes after
+    fork, so children do not repeat OIDs of their parent.
+    """
+
+    def __init__(self, length=None, batch_size=None):
+        self.length = min(length or OID_LENGTH, OID_MAX_LENGTH)
+        self.batch_size = batch_size or OID_BATCH_SIZE
+        self._local = threading.local()
+        register_after_fork(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._local.buffer)
+        except (AttributeError, StopIteration):
+            self._local.buffer = self._make_buffer()
+            return next(self._local.buffer)
+
+    # Python 3 compatibility
+    next = __next__
+
+    def _after_fork(self):
+        self._local = threading.local()
+
+    def _make_buffer(self):
+        length = self.length
+        size = length * self.batch_size
+
+        data = os.urandom((size + 1) // 2)
+        data = binascii.hexlify(data).decode('ascii').upper()
+
+        return iter([data[i:i + length] for i in range(0, size, length)])
+
+
+def generate_batched_oid(length=None, batch_size=None):
+    """
+    OID generator which uses batches of random bytes to produce result.
+    """
+    return BatchedOIDGenerator(length, batch_size)
+
+
+def _check_fits(name, value, length):
+    limit = len(OID_ALPHABET) ** length
+
+    if not 0 <= value < limit:
+        raise ValueError(
+            "{name} must be within [0, {limit}) to fit into {length} "
+            "characters, got {value}."
+            .format(name=name, limit=limit, length=length, value=value))
+
+
+class _Shard(object):
+    """
+    Shard of OIDs and number of OIDs which have been taken from it.
+    """
+
+    __slots__ = ['tag', 'position', ]
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.position = 0
+
+
+class ShardedOIDGenerator(object):
+    """
+    OID generator which gives every thread own stream of OIDs. Each OID is
+    composed of a tag of current process, a tag of the shard owned by current
+    thread and a value of thread-local counter.
+
+    Shared state is touched only when a thread uses generator for the first
+    time, when it exhausts its shard or when it dies, so generation of OIDs
+    does not touch shared state. Shards of dead threads are given to new
+    threads along with positions of their counters. OIDs are unique until all
+    shards are exhausted, then `RuntimeError` is raised.
+
+    Child processes drop shards inherited from their parent after fork and
+    start own shards with own process tags, so OIDs are unique across
+    processes which run at the same time. Process tags are derived from IDs
+    of processes, which must fit into ``process_length`` characters. Pass
+    zero ``process_length`` to omit process tags.
+    """
+
+    def __init__(self, length=None, shard_length=None, process_length=None):
+        self.process_length = (OID_SHARD_PROCESS_LENGTH
+                               if process_length is None else process_length)
+        self.length = min(length or OID_SHARDED_LENGTH,
+                          OID_MAX_LENGTH - self.process_length)
+        self.shard_length = shard_length or OID_SHARD_LENGTH
+
+        if not 0 < self.shard_length < self.length:
+            raise ValueError(
+                "Shard length must be less than OID length ({length}), got "
+                "{shard_length}."
+                .format(length=self.length, shard_length=self.shard_length))
+
+        if self.process_length:
+            _check_fits("Process ID", os.getpid(), self.process_length)
+
+        self.shards_number = len(OID_ALPHABET) ** self.shard_length
+        self.shard_size = len(OID_ALPHABET) ** (self.length -
+                                                self.shard_length)
+        self._init_shards()
+        register_after_fork(self)
+
+    def _init_shards(self):
+        self.process_tag = _encode(os.getpid(), self.process_length)
+        self._shards = itertools.count()
+        self._free_shards = deque()
+        self._streams = set()
+        self._local = threading.local()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._local.stream)
+        except (AttributeError, StopIteration):
+            self._local.stream = self._make_stream()
+            return next(self._local.stream)
+
+    # Python 3 compatibility
+    next = __next__
+
+    def _after_fork(self):
+        # Weak references to streams of the parent are dropped before the
+        # streams, so their shards are never released into the child
+        self._streams.clear()
+        self._free_shards.clear()
+        self._init_shards()
+
+    def _acquire_shard(self):
+        try:
+            return self._free_shards.popleft()
+        except IndexError:
+            pass
+
+        index = next(self._shards)
+
+        if index >= self.shards_number:
+            raise RuntimeError(
+                "All {0} shards of OIDs are exhausted."
+                .format(self.shards_number))
+
+        return _Shard(self.process_tag + _encode(index, self.shard_length))
+
+    def _release_shard(self, shard, ref):
+        self._streams.discard(ref)
+
+        if shard.position < self.shard_size:
+            self._free_shards.append(shard)
+
+    def _make_stream(self):
+        shard = self._acquire_shard()
+        stream = self._iterate_shard(shard)
+
+        # Shard is released when its stream is dropped, e.g. by a dead thread
+        self._streams.add(weakref.ref(
+            stream, lambda ref: self._release_shard(shard, ref)))
+
+        return stream
+
+    def _iterate_shard(self, shard):
+        tag = shard.tag
+        values = itertools.product(OID_ALPHABET,
+                                   repeat=self.length - self.shard_length)
+
+        for chars in itertools.islice(values, shard.position, None):
+            shard.position += 1
+            yield tag + ''.join(chars)
+
+
+def generate_sharded_oid(length=None, shard_length=None,
+                         process_length=None):
+    """
+    OID generator which uses thread-local counters within shards to produce
+    result.
+
+    A process can get ``32 ** length`` OIDs in total, e.g. about 10 ** 15 OIDs
+    with default length of 10 characters, then `RuntimeError` is raised.
+    OIDs are prefixed with process tags of ``process_length`` characters.
+    """
+    return ShardedOIDGenerator(length, shard_length, process_length)
+
+
+def _timestamp_length(resolution):
+    """
+    Get number of characters which encode timestamps of given resolution up
+    to the time when timestamps of default length and resolution overflow.
+    """
+    base = len(OID_ALPHABET)
+    limit = base ** OID_TIMESTAMP_LENGTH * OID_TIMESTAMP_RESOLUTION
+    length = 1
+
+    while base ** length * resolution < limit:
+        length += 1
+
+    return length
+
+
+class TimeOrderedOIDGenerator(object):
+    """
+    OID generator which produces OIDs sortable by time of their creation.
+
+    Each OID is composed of a coarse timestamp followed by a random suffix.
+    Both parts are encoded using OID alphabet, which is sorted, so OIDs can be
+    compared lexicographically.
+
+    Length of timestamps is derived from their resolution, so timestamps of
+    any resolution do not overflow until the same time as timestamps of
+    default length and resolution do.
+    """
+
+    def __init__(self, entropy_length=None, resolution=None):
+        self.resolution = resolution or OID_TIMESTAMP_RESOLUTION
+        self.timestamp_length = _timestamp_length(self.resolution)
+
+        if self.timestamp_length >= OID_MAX_LENGTH:
+            raise ValueError(
+                "Timestamps of resolution {0} do not fit into OIDs"
+                .format(self.resolution))
+
+        self.entropy_length = min(entropy_length or OID_LENGTH,
+                                  OID_MAX_LENGTH - self.timestamp_length)
+
+    @property
+    def length(self):
+        return self.timestamp_length + self.entropy_length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        timestamp = int(time.time() / self.resolution)
+        entropy = random.getrandbits(5 * self.entropy_length)
+
+        return (_encode(timestamp, self.timestamp_length) +
+                _encode(entropy, self.entropy_length))
+
+    # Python 3 compatibility
+    next = __next__
+
+    def get_time(self, oid):
+        """
+        Get time (in seconds since the epoch) encoded into given OID.
+        """
+        timestamp = _decode(oid[:self.timestamp_length])
+        return timestamp * self.resolution
+
+
+def generate_time_ordered_oid(entropy_length=None, resolution=None):
+    """
+    OID generator which uses current time and random suffixes to produce
+    result.
+    """
+    return TimeOrderedOIDGenerator(entropy_length, resolution)
+
+
+class UniqueOIDGenerator(object):
+    """
+    OID generator which wraps another generator and guarantees that produced
+    OIDs do not repeat within a window of recent OIDs.
+
+    Window is bounded by number of OIDs and, optionally, by their age in
+    seconds. Recent OIDs are kept in a ring buffer accompanied by a set, so
+    memory usage is fixed and every check costs O(1). Checks are serialized by
+    a lock, as the window is shared by all threads.
+    """
+
+    def __init__(self, generator=None, window=None, ttl=None,
+                 max_attempts=None):
+        self.generator = generator or generate_default_oid()
+        self.window = window or OID_UNIQUENESS_WINDOW
+        self.ttl = ttl
+        self.max_attempts = max_attempts or OID_UNIQUENESS_MAX_ATTEMPTS
+
+        self._recent = set()
+        self._queue = deque()
+        self.lock = threading.Lock()
+        register_after_fork(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            if self.ttl is None:
+                now = None
+            else:
+                now = time.time()
+                self._expire(now)
+
+            for x in range(self.max_attempts):
+                oid = next(self.generator)
+
+                if oid not in self._recent:
+                    self._remember(oid, now)
+                    return oid
+
+        raise RuntimeError(
+            "Failed to generate OID which is unique within window of {window} "
+            "OIDs after {attempts} attempts."
+            .format(window=self.window, attempts=self.max_attempts))
+
+    # Python 3 compatibility
+    next = __next__
+
+    def _after_fork(self):
+        self.lock = threading.Lock()
+
+    def _remember(self, oid, now):
+        if len(self._queue) >= self.window:
+            self._recent.discard(self._queue.popleft()[0])
+
+        self._recent.add(oid)
+        self._queue.append((oid, now))
+
+    def _expire(self, now):
+        deadline = now - self.ttl
+        queue = self._queue
+
+        while queue and queue[0][1] < deadline:
+            self._recent.discard(queue.popleft()[0])
+
+
+def generate_unique_oid(generator=None, window=None, ttl=None,
+                        max_attempts=None):
+    """
+    OID generator which filters out OIDs produced recently by given generator.
+    """
+    return UniqueOIDGenerator(generator, window, ttl, max_attempts)
+
+
+class AdaptiveLengthOIDGenerator(object):
+    """
+    OID generator which adapts length of OIDs to observed rate of operations.
+
+    Generator counts OIDs issued within a recent window of time and picks the
+    shortest length which keeps probability of a collision among them
+    (according to the birthday problem) under given target. Length grows as
+    soon as rate goes up and it shrinks when the window is over.
+
+    Current length is available as ``length`` attribute. Generator does not
+    take any locks: counting is done by ``itertools.count`` and random
+    hex-encoded OIDs are taken from per-thread buffers.
+    """
+
+    def __init__(self, window=None, collision_probability=None,
+                 min_length=None):
+        self.window = window or OID_ADAPTIVE_WINDOW
+        self.collision_probability = (collision_probability or
+                                      OID_COLLISION_PROBABILITY)
+        self.min_length = min(min_length or OID_ADAPTIVE_MIN_LENGTH,
+                              OID_MAX_LENGTH)
+
+        # Maximal number of pairs of OIDs per a single value of OID space
+        self._pairs_ratio = -math.log(1 - self.collision_probability)
+
+        self._source = BatchedOIDGenerator(OID_MAX_LENGTH)
+        self._counter = itertools.count()
+        self._window_start = (time.time(), 0)
+        self._set_length(self.min_length)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        count = next(self._counter)
+        start_time, start_count = self._window_start
+        issued = count - start_count + 1
+
+        if issued > self._limit:
+            self._set_length(self.get_length(issued))
+
+        now = time.time()
+
+        if now - start_time >= self.window:
+            self._window_start = (now, count)
+            self._set_length(self.get_length(issued))
+
+        return next(self._source)[:self.length]
+
+    # Python 3 compatibility
+    next = __next__
+
+    def get_length(self, issued):
+        """
+        Get the shortest length of OIDs which keeps probability of a collision
+        among given number of OIDs under the target.
+        """
+        for length in range(self.min_length, OID_MAX_LENGTH):
+            if issued <= self._get_limit(length):
+                return length
+
+        return OID_MAX_LENGTH
+
+    def _get_limit(self, length):
+        pairs = (16 ** length) * self._pairs_ratio
+        return int((1 + math.sqrt(1 + 8 * pairs)) / 2)
+
+    def _set_length(self, length):
+        self._limit = self._get_limit(length)
+        self.length = length
+
+
+def generate_adaptive_length_oid(window=None, collision_probability=None,
+                                 min_length=None):
+    """
+    OID generator which uses length of OIDs adapted to rate of their
+    generation.
+    """
+    return AdaptiveLengthOIDGenerator(window, collision_probability,
+                                      min_length)
+
+
+class ProcessTaggedOIDGenerator(object):
+    """
+    OID generator which wraps another generator and prepends a tag of current
+    process to produced OIDs.
+
+    Tag is derived from ID of current process and it is recomputed in child
+    processes after fork, so OIDs produced by counter-based generators in
+    different processes do not collide.
+    """
+
+    def __init__(self, generator=None, tag_length=None):
+        self.generator = generator or generate_default_oid()
+        self.tag_length = tag_length or OID_PROCESS_TAG_LENGTH
+        self._after_fork()
+        register_after_fork(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.tag + next(self.generator)
+
+    # Python 3 compatibility
+    next = __next__
+
+    def _after_fork(self):
+        pid = os.getpid() % (len(OID_ALPHABET) ** self.tag_length)
+        self.tag = _encode(pid, self.tag_length)
+
+
+def generate_process_tagged_oid(generator=None, tag_length=None):
+    """
+    OID generator which prepends tags of current process to OIDs of given
+    generator.
+    """
+    return ProcessTaggedOIDGenerator(generator, tag_length)
+
+
+class SnowflakeOIDGenerator(object):
+    """
+    OID generator which composes OIDs of ID of a node, ID of current process
+    and a value of a monotonically increasing counter.
+
+    OIDs are unique by construction within a fleet of nodes with distinct IDs
+    until the counter wraps around. Generation of an OID requires arithmetic
+    only: there are no calls to RNG, system calls or locks.
+
+    Node IDs must be assigned explicitly, so that every node has its own one,
+    and they must fit into ``node_length`` characters. Process IDs must fit
+    into ``process_length`` characters: default length allows IDs below
+    ``2 ** 25``, which covers the maximal ID of Linux processes (``2 ** 22``).
+
+    Process ID is refreshed and the counter is reset in child processes after
+    fork. Note, if a process is restarted and gets the same ID, it will repeat
+    OIDs of its predecessor.
+    """
+
+    def __init__(self, node_id, node_length=None, process_length=None,
+                 counter_length=None):
+        self.node_length = node_length or OID_NODE_LENGTH
+        self.process_length = process_length or OID_SNOWFLAKE_PROCESS_LENGTH
+        self.counter_length = counter_length or OID_COUNTER_LENGTH
+
+        if self.length > OID_MAX_LENGTH:
+            raise ValueError(
+                "Length of OIDs ({length}) must not exceed {max_length}."
+                .format(length=self.length, max_length=OID_MAX_LENGTH))
+
+        _check_fits("Node ID", node_id, self.node_length)
+        _check_fits("Process ID", os.getpid(), self.process_length)
+
+        self.node_id = node_id
+        self._capacity = len(OID_ALPHABET) ** self.counter_length
+        self._after_fork()
+        register_after_fork(self)
+
+    @property
+    def length(self):
+        return self.node_length + self.process_length + self.counter_length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = next(self._counter) % self._capacity
+        return self._prefix + _encode(value, self.counter_length)
+
+    # Python 3 compatibility
+    next = __next__
+
+    def _after_fork(self):
+        self.process_id = os.getpid()
+        self._prefix = (_encode(self.node_id, self.node_length) +
+                        _encode(self.process_id, self.process_length))
+        self._counter = itertools.count()
+
+
+def generate_snowflake_oid(node_id, node_length=None, process_length=None,
+                           counter_length=None):
+    """
+    OID generator which uses IDs of node and process followed by a counter to
+    produce result.
+    """
+    return SnowflakeOIDGenerator(node_id, node_length, process_length,
+                                 counter_length)
+
+
+generate_default_oid = generate_batched_oid
+default_oid_generator = generate_default_oid()
 
 
 def generate_oid(generator=None):
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import weakref
+
+from . import timing
+from .context import ScopeListener
+from .defaults import (
+    HISTOGRAM_PRECISION, HISTOGRAM_MAX_VALUE, HISTOGRAM_PERCENTILES,
+)
+
+
+class LatencyHistogram(object):
+    """
+    Log-linear histogram of durations with fixed memory footprint.
+
+    Durations are counted in microseconds. Values below ``2 ** precision``
+    are counted exactly, larger ones fall into buckets whose width relative
+    to their values does not exceed ``2 ** -(precision - 1)``. Values above
+    ``max_value`` are counted as ``max_value``.
+
+    Histograms are not thread-safe: every histogram is expected to have a
+    single writer.
+    """
+
+    __slots__ = ['precision', 'max_value', 'counts', 'count', 'max', ]
+
+    def __init__(self, precision=None, max_value=None):
+        self.precision = precision or HISTOGRAM_PRECISION
+        self.max_value = max_value or HISTOGRAM_MAX_VALUE
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.max = 0
+
+    def _index(self, value):
+        shift = value.bit_length() - self.precision
+
+        if shift <= 0:
+            return value
+
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _upper_bound(self, index):
+        half = 1 << (self.precision - 1)
+
+        if index < (half << 1):
+            return index
+
+        shift = index // half - 1
+        top = index - shift * half
+        return ((top + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1000000), 0), self.max_value)
+
+        self.counts[self._index(value)] += 1
+        self.count += 1
+
+        if value > self.max:
+            self.max = value
+
+    def update(self, other):
+        """
+        Add counts of another histogram with the same precision and maximal
+        value.
+        """
+        counts = self.counts
+
+        for i, count in enumerate(other.counts):
+            if count:
+                counts[i] += count
+
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts[:] = [0] * len(self.counts)
+        self.count = 0
+        self.max = 0
+
+    def percentile(self, percent):
+        """
+        Get the highest duration in seconds which is equivalent to the given
+        percentile, or ``None`` if histogram is empty.
+        """
+        if not self.count:
+            return None
+
+        target = max(1, int(-(-self.count * percent // 100)))
+        total = 0
+
+        for index, count in enumerate(self.counts):
+            total += count
+
+            if total >= target:
+                return min(self._upper_bound(index), self.max) / 1e6
+
+        return self.max / 1e6
+
+    def summary(self, percentiles=None):
+        result = {'count': self.count, 'max': self.max / 1e6, }
+
+        for percent in percentiles or HISTOGRAM_PERCENTILES:
+            result['p{0}'.format(percent)] = self.percentile(percent)
+
+        return result
+
+
+class _ThreadMarker(object):
+    """
+    Object which lives as long as thread-local data of a thread.
+    """
+
+
+class LatencyRegistry(ScopeListener):
+    """
+    Registry of latency histograms keyed by names of injection scopes.
+
+    Register it as a listener of injection contexts to record durations of
+    named scopes, e.g. of ``static_injector("Analysis")``:
+
+        >>> registry = LatencyRegistry()
+        >>> context.add_listener(registry)
+
+    Every thread records into own shards of histograms, so recording takes a
+    lock only when a thread records a name for the first time. Queries merge
+    shards of all threads. Shards of dead threads are merged into common
+    histograms and freed, so memory does not grow with number of threads
+    which have ever recorded durations.
+    """
+
+    def __init__(self, precision=None, max_value=None):
+        self.precision = precision
+        self.max_value = max_value
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # Histograms of live threads keyed by weak references to markers of
+        # threads and merged histograms of dead threads
+        self._threads = {}
+        self._merged = {}
+
+    def scope_exited(self, context, injector, exc_type):
+        if context.name is not None:
+            self.record(context.name, timing.elapsed(injector.enter_time))
+
+    def record(self, name, seconds):
+        try:
+            histograms = self._local.histograms
+        except AttributeError:
+            histograms = self._add_thread()
+
+        try:
+            histogram = histograms[name]
+        except KeyError:
+            histogram = LatencyHistogram(self.precision, self.max_value)
+
+            with self._lock:
+                histograms[name] = histogram
+
+        histogram.record(seconds)
+
+    def _add_thread(self):
+        histograms = self._local.histograms = {}
+        marker = self._local.marker = _ThreadMarker()
+        ref = weakref.ref(marker, self._remove_thread)
+
+        with self._lock:
+            self._threads[ref] = histograms
+
+        return histograms
+
+    def _remove_thread(self, ref):
+        with self._lock:
+            histograms = self._threads.pop(ref, {})
+
+            for name, histogram in histograms.items():
+                try:
+                    self._merged[name].update(histogram)
+                except KeyError:
+                    self._merged[name] = histogram
+
+    def _shards(self):
+        """
+        Get list of pairs of names and histograms of all threads.
+        """
+        with self._lock:
+            shards = list(self._merged.items())
+
+            for histograms in self._threads.values():
+                shards.extend(histograms.items())
+
+        return shards
+
+    def names(self):
+        return sorted(set(name for name, _ in self._shards()))
+
+    def histogram(self, name):
+        """
+        Get histogram which merges shards of all threads for given name.
+        """
+        result = LatencyHistogram(self.precision, self.max_value)
+
+        for key, shard in self._shards():
+            if key == name:
+                result.update(shard)
+
+        return result
+
+    def summary(self, percentiles=None):
+        return dict(
+            (name, self.histogram(name).summary(percentiles))
+            for name in self.names())
+
+    def dump(self, path, percentiles=None):
+        """
+        Write summary of all histograms into a JSON file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.summary(percentiles), f, indent=2, sort_keys=True)
+
+    def reset(self):
+        for _, shard in self._shards():
+            shard.reset()
@@ -1,20 +1,32 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-import datetime
-import time
-
-from .defaults import ELAPSED_TIME_FORMAT
+from . import timing
+from .compaction import compact_chunks
+from .defaults import DELIMITER
 from .generators import generate_oid
-from .prefix import make_prefix, join_prefix
+from .prefix import make_prefix, compose_prefix
 
 
 class DirectPrefixInjector(object):
+    """
+    Injector of a prefix which is given as is.
+
+    Besides the prefix itself, injectors keep its ``chunks`` and ``delimiter``
+    which follows every chunk. Prefix of a direct injector is a single chunk
+    followed by an empty delimiter, unless chunks are given explicitly.
+
+    Injectors of prefixes which include generated OIDs keep the first of them
+    as ``oid``.
+    """
 
-    __slots__ = ['prefix', 'enter_time', ]
+    __slots__ = ['prefix', 'chunks', 'delimiter', 'oid', 'enter_time', ]
 
-    def __init__(self, prefix):
+    def __init__(self, prefix, chunks=None, delimiter="", oid=None):
         self.prefix = prefix
+        self.chunks = chunks or (prefix, )
+        self.delimiter = delimiter
+        self.oid = oid
 
         # `enter_time` will be set by context manager
         self.enter_time = None
@@ -23,19 +35,49 @@ class DirectPrefixInjector(object):
         # Use `format` as it will automatically convert parameters to strings
         return "{0}{1}".format(self.prefix, message)
 
+    @property
+    def fields(self):
+        """
+        Description of prefix which can be passed as ``extra`` to loggers.
+        """
+        return {
+            'isotopic_oid': self.oid,
+            'isotopic_chunks': self.chunks,
+            'isotopic_delimiter': self.delimiter,
+            'isotopic_prefix': self.prefix,
+        }
+
     @property
     def elapsed_time(self):
-        try:
-            return time.time() - self.enter_time
-        except TypeError:
+        return timing.elapsed(self._get_enter_time())
+
+    @property
+    def thread_time(self):
+        """
+        CPU time in seconds spent by current thread within the scope, or
+        ``None`` if scope is not tracked by monotonic clock.
+        """
+        return timing.thread_elapsed(self._get_enter_time())
+
+    @property
+    def process_time(self):
+        """
+        CPU time in seconds spent by current process within the scope, or
+        ``None`` if scope is not tracked by monotonic clock.
+        """
+        return timing.process_elapsed(self._get_enter_time())
+
+    def _get_enter_time(self):
+        if self.enter_time is None:
             raise ValueError(
                 "Prefix injector '{injector}' is out of context, hence has no "
                 "elapsed time."
                 .format(injector=self))
 
+        return self.enter_time
+
     def format_elapsed_time(self, fmt=None):
-        dt = datetime.datetime.utcfromtimestamp(self.elapsed_time)
-        return dt.strftime(fmt or ELAPSED_TIME_FORMAT)
+        return timing.format_duration(self.elapsed_time, fmt)
 
     def __repr__(self):
         return """<{module}.{name}("{prefix}")>""".format(
@@ -47,25 +89,156 @@ class DirectPrefixInjector(object):
 class StaticPrefixInjector(DirectPrefixInjector):
 
     def __init__(self, prefix, delimiter=None):
-        prefix = make_prefix(prefix, delimiter)
-        super(StaticPrefixInjector, self).__init__(prefix)
+        delimiter = delimiter or DELIMITER
+        super(StaticPrefixInjector, self).__init__(
+            make_prefix(prefix, delimiter), (prefix, ), delimiter)
 
 
 class AutoprefixInjector(StaticPrefixInjector):
 
     def __init__(self, oid_generator=None, delimiter=None):
         autopart = generate_oid(oid_generator)
-        super(AutoprefixInjector, self).__init__(autopart, delimiter)
+        delimiter = delimiter or DELIMITER
+
+        # OIDs are unique, so they are not passed through cache of fragments
+        DirectPrefixInjector.__init__(
+            self, autopart + delimiter, (autopart, ), delimiter, autopart)
 
 
 class HybridPrefixInjector(DirectPrefixInjector):
 
     def __init__(self, prefix, oid_generator=None, delimiter=None):
+        delimiter = delimiter or DELIMITER
         autopart = generate_oid(oid_generator)
-        prefix = join_prefix([autopart, prefix, ], delimiter)
-        super(HybridPrefixInjector, self).__init__(prefix)
+        super(HybridPrefixInjector, self).__init__(
+            autopart + delimiter + make_prefix(prefix, delimiter),
+            (autopart, prefix, ),
+            delimiter,
+            autopart)
+
+
+class RopePrefixInjector(DirectPrefixInjector):
+    """
+    Injector of a prefix which extends prefix of a parent injector with
+    prefix of another injector.
+
+    Injector keeps a reference to its parent and own part of the prefix only.
+    Full prefix and chunks are built on first access, so deep chains of
+    inherited scopes do not keep copies of prefixes of their parents. Both
+    injectors must have the same delimiter.
+    """
+
+    __slots__ = ['parent', 'own_prefix', 'own_chunks', '_prefix', '_chunks', ]
+
+    def __init__(self, parent, injector):
+        self.parent = parent
+        self.own_prefix = injector.prefix
+        self.own_chunks = injector.chunks
+        self.delimiter = injector.delimiter
+        self.oid = injector.oid if parent.oid is None else parent.oid
+        self.enter_time = None
+        self._prefix = None
+        self._chunks = None
+
+    def _collect(self, built, own, full):
+        """
+        Collect parts of a value from own attributes of ropes up to the
+        closest injector which has the value built already.
+        """
+        parts = []
+        node = self
+
+        while isinstance(node, RopePrefixInjector):
+            value = getattr(node, built)
+
+            if value is not None:
+                break
+
+            parts.append(getattr(node, own))
+            node = node.parent
+        else:
+            value = getattr(node, full)
+
+        parts.append(value)
+        parts.reverse()
+        return parts
+
+    @property
+    def prefix(self):
+        prefix = self._prefix
+
+        if prefix is None:
+            prefix = self._prefix = compose_prefix(
+                *self._collect('_prefix', 'own_prefix', 'prefix'))
+
+        return prefix
+
+    @property
+    def chunks(self):
+        chunks = self._chunks
+
+        if chunks is None:
+            chunks = ()
+
+            for part in self._collect('_chunks', 'own_chunks', 'chunks'):
+                chunks += part
+
+            self._chunks = chunks
+
+        return chunks
+
+    def mark(self, message):
+        return "{0}{1}".format(self._prefix or self.prefix, message)
+
+
+def inherit_injector(parent, injector, max_length=None):
+    """
+    Get injector which extends prefix of parent injector with prefix of given
+    injector.
+
+    If ``max_length`` is given, prefix is compacted to fit into it.
+    """
+    if max_length is not None:
+        return merge_injectors(parent, injector, max_length=max_length)
+
+    if parent.delimiter == injector.delimiter:
+        return RopePrefixInjector(parent, injector)
+
+    return merge_injectors(parent, injector)
+
+
+def merge_injectors(*args, **kwargs):
+    """
+    Get injector of combined prefix of given injectors.
+
+    If ``max_length`` keyword argument is given and combined prefix is longer,
+    middle chunks of prefix are replaced with digests. Chunks of the injector
+    are compacted in the same way.
+    """
+    max_length = kwargs.pop('max_length', None)
+
+    if kwargs:
+        raise TypeError(
+            "Unexpected keyword arguments: {0}".format(", ".join(kwargs)))
+
+    prefix = compose_prefix(*[x.prefix for x in args])
+    delimiter = args[0].delimiter
+    chunks, oid = (), None
+
+    for x in args:
+        if oid is None:
+            oid = x.oid
+
+        if chunks is not None:
+            # Chunks cannot be separated by a common delimiter if delimiters
+            # differ
+            chunks = chunks + x.chunks if x.delimiter == delimiter else None
+
+    if chunks is None:
+        return DirectPrefixInjector(prefix, oid=oid)
 
+    if max_length is not None and len(prefix) > max_length:
+        chunks = compact_chunks(chunks, delimiter, max_length)
+        prefix = delimiter.join(chunks) + delimiter
 
-def merge_injectors(*args):
-    prefix = ''.join([x.prefix for x in args])
-    return DirectPrefixInjector(prefix)
+    return DirectPrefixInjector(prefix, chunks, delimiter, oid)
@@ -1,25 +1,57 @@
 # -*- coding: utf-8 -*-
 
-from contextlib import contextmanager
-
+from .concurrency import completed
 from .context import (
     direct_injector, static_injector, auto_injector, hybrid_injector,
 )
-from .proxy import LoggerProxy
+from .proxy import LoggerProxy, CurrentLoggerProxy
+
+
+class LoggerProxyContext(object):
+    """
+    Context manager which enters given injection context and provides a proxy
+    for given logger with injector of the context.
+
+    Can be used both by ``with`` and ``async with`` statements.
+    """
+
+    __slots__ = ['logger', 'injector_context', 'structured', ]
+
+    def __init__(self, logger, injector_context, structured=False):
+        self.logger = logger
+        self.injector_context = injector_context
+        self.structured = structured
 
+    def __enter__(self):
+        injector = self.injector_context.__enter__()
+        return LoggerProxy(self.logger, injector, self.structured)
 
-@contextmanager
-def _get_proxy(logger, injector_context):
-    with injector_context as injector:
-        yield LoggerProxy(logger, injector)
+    def __exit__(self, exc_type, value, traceback):
+        return self.injector_context.__exit__(exc_type, value, traceback)
+
+    def __aenter__(self):
+        return completed(self.__enter__())
+
+    def __aexit__(self, exc_type, value, traceback):
+        return completed(self.__exit__(exc_type, value, traceback))
 
 
 class IsotopicLogger(object):
+    """
+    Wrapper for loggers which provides proxies with injected prefixes.
+
+    If ``structured`` is set, proxies pass fields of prefixes as ``extra``
+    fields of log records instead of injecting prefixes into messages.
+    """
 
-    __slots__ = ['_original', ]
+    __slots__ = ['_original', '_structured', 'current', ]
 
-    def __init__(self, logger):
+    def __init__(self, logger, structured=False):
         self._original = logger
+        self._structured = structured
+
+        # Proxy which injects prefix of current injector
+        self.current = CurrentLoggerProxy(logger, structured)
 
     def __getattr__(self, name):
         return getattr(self._original, name)
@@ -38,4 +70,9 @@ class IsotopicLogger(object):
 
     def _get_proxy(self, context_factory, *args, **kwargs):
         context = context_factory(*args, **kwargs)
-        return _get_proxy(self._original, context)
+
+        # Report slow scopes by the wrapped logger in the same mode as proxies
+        context.slow_scope_logger = self._original
+        context.slow_scope_structured = self._structured
+
+        return LoggerProxyContext(self._original, context, self._structured)
@@ -1,12 +1,79 @@
 # -*- coding: utf-8 -*-
 
-from .defaults import DELIMITER
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2
+    lru_cache = None
 
+from .defaults import DELIMITER, PREFIX_CACHE_SIZE, COMPOSED_PREFIX_CACHE_SIZE
 
+
+def _cached(maxsize):
+    """
+    Wrap function with bounded LRU cache, if caches are supported.
+    """
+    if lru_cache is None:
+        return lambda func: func
+
+    return lru_cache(maxsize=maxsize)
+
+
+@_cached(PREFIX_CACHE_SIZE)
 def make_prefix(prefix, delimiter=None):
     return prefix + (delimiter or DELIMITER)
 
 
 def join_prefix(chunks, delimiter=None):
     delimeter = delimiter or DELIMITER
-    return make_prefix(delimeter.join(chunks), delimeter)
+    return delimeter.join(chunks) + delimeter
+
+
+@_cached(COMPOSED_PREFIX_CACHE_SIZE)
+def _compose_tail(*prefixes):
+    return ''.join(prefixes)
+
+
+def compose_prefix(*prefixes):
+    """
+    Concatenate prefixes of nested scopes.
+
+    The first prefix usually starts with a generated OID, so it is prepended
+    without caching. Equal compositions of the rest of prefixes share the
+    same string while they are kept in cache.
+    """
+    if len(prefixes) < 3:
+        return ''.join(prefixes)
+
+    return prefixes[0] + _compose_tail(*prefixes[1:])
+
+
+def prefix_cache_info():
+    """
+    Get statistics of caches of prefix fragments and composed prefixes below
+    their first parts, or `None` if caches are not supported.
+    """
+    if lru_cache is None:
+        return None
+
+    result = {}
+
+    for name, func in [('fragments', make_prefix),
+                       ('composed', _compose_tail), ]:
+        info = func.cache_info()
+        total = info.hits + info.misses
+        result[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': float(info.hits) / total if total else None,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+        }
+
+    return result
+
+
+def clear_prefix_caches():
+    if lru_cache is not None:
+        make_prefix.cache_clear()
+        _compose_tail.cache_clear()
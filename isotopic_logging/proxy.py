@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
 
-from functools import wraps
+import logging
 
+from functools import wraps
 
-_wrapped_method_names = {
-    'debug', 'info', 'warn', 'warning', 'error', 'fatal', 'critical',
-    'exception',
+from . import context
+from .records import (
+    _empty_injector, is_record_factory_installed, override_injector,
+)
+
+
+# Names of wrapped methods mapped to levels of messages they log
+_wrapped_method_levels = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warn': logging.WARNING,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'exception': logging.ERROR,
+    'fatal': logging.CRITICAL,
+    'critical': logging.CRITICAL,
 }
 
 
@@ -21,16 +35,34 @@ class LoggerProxy(object):
     just to
 
         >>> logger.log_level("message")
+
+    If ``structured`` is set, messages are passed as is and fields of
+    injector are passed as ``extra`` fields of log records instead, unless
+    record factory of `isotopic_logging.records` is installed, which attaches
+    them itself.
+
+    Prefixes are injected only if the level of the message is enabled, so
+    calls at disabled levels cost about the same as calls of the original
+    logger.
     """
 
-    def __init__(self, logger, injector):
+    def __init__(self, logger, injector, structured=False):
         self._original = logger
         self.injector = injector
+        self.structured = structured
 
     @property
     def elapsed_time(self):
         return self.injector.elapsed_time
 
+    @property
+    def thread_time(self):
+        return self.injector.thread_time
+
+    @property
+    def process_time(self):
+        return self.injector.process_time
+
     def format_elapsed_time(self, fmt=None):
         return self.injector.format_elapsed_time(fmt)
 
@@ -45,14 +77,60 @@ class LoggerProxy(object):
         """
         result = getattr(self._original, name)
 
-        if name in _wrapped_method_names:
+        if name in _wrapped_method_levels:
+            level = _wrapped_method_levels[name]
+            is_enabled_for = self._original.isEnabledFor
+
+            if self.structured:
+
+                @wraps(result)
+                def wrapper(message, *args, **kwargs):
+                    if not is_enabled_for(level):
+                        return
+
+                    if is_record_factory_installed():
+                        # Factory does not allow to overwrite its fields
+                        with override_injector(self.injector):
+                            return result(message, *args, **kwargs)
+
+                    fields = self.injector.fields
+                    extra = kwargs.get('extra')
 
-            @wraps(result)
-            def wrapper(message, *args, **kwargs):
-                return result(self.injector.mark(message), *args, **kwargs)
+                    if extra:
+                        fields.update(extra)
+
+                    kwargs['extra'] = fields
+                    return result(message, *args, **kwargs)
+
+            else:
+
+                @wraps(result)
+                def wrapper(message, *args, **kwargs):
+                    if is_enabled_for(level):
+                        return result(self.injector.mark(message), *args,
+                                      **kwargs)
 
             # Cache wrapper, so it won't be constructed again for future calls.
             setattr(self, name, wrapper)
             return wrapper
 
         return result
+
+
+class CurrentLoggerProxy(LoggerProxy):
+    """
+    Proxy which injects prefix of current injector, i.e. the one which is on
+    top of injection stack at the moment of call.
+
+    This allows to create a proxy once and to use it within functions
+    decorated by injection scopes.
+    """
+
+    def __init__(self, logger, structured=False):
+        self._original = logger
+        self.structured = structured
+
+    @property
+    def injector(self):
+        item = context._stack.top
+        return _empty_injector if item is None else item.injector
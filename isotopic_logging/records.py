@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Injection of prefixes into log records of any loggers without logger proxies.
+
+Fields of current injector are attached to log records as attributes, so
+formatters can render them, e.g. ``%(isotopic_prefix)s%(message)s``. This
+can be done either by a record factory, which is installed once per process,
+or by a filter, which is added to handlers.
+"""
+
+import logging
+import threading
+
+from . import context
+from .injectors import DirectPrefixInjector
+
+
+# Injector which is used if there's no current injector
+_empty_injector = DirectPrefixInjector("")
+
+# Keeps injector which has to be used instead of current one for records
+# created by current thread, e.g. by structured logger proxies
+_override = threading.local()
+
+
+def current_fields():
+    """
+    Get fields of injector which is on top of injection stack.
+    """
+    injector = getattr(_override, 'injector', None)
+
+    if injector is None:
+        item = context._stack.top
+        injector = _empty_injector if item is None else item.injector
+
+    return injector.fields
+
+
+class override_injector(object):
+    """
+    Context manager which makes record factory attach fields of given
+    injector instead of fields of current one.
+    """
+
+    def __init__(self, injector):
+        self.injector = injector
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_override, 'injector', None)
+        _override.injector = self.injector
+
+    def __exit__(self, exc_type, value, traceback):
+        _override.injector, self._previous = self._previous, None
+
+
+class IsotopicFilter(logging.Filter):
+    """
+    Filter which attaches fields of current injector to log records.
+
+    Add it to handlers to tag records of all loggers which reach them. Filters
+    have to run in threads which emit records, so add it to queue handlers
+    rather than to handlers of queue listeners. Records which already have
+    the fields, e.g. records of structured logger proxies, are kept as is.
+    """
+
+    def filter(self, record):
+        if 'isotopic_prefix' not in record.__dict__:
+            record.__dict__.update(current_fields())
+
+        return True
+
+
+# Record factory which was replaced by `install_record_factory`
+_original_factory = None
+
+
+def install_record_factory():
+    """
+    Wrap current factory of log records, so every record created in the
+    process gets fields of current injector.
+
+    While the factory is installed, structured logger proxies pass fields of
+    their injectors to the factory rather than via ``extra``.
+    """
+    global _original_factory
+
+    if not hasattr(logging, 'setLogRecordFactory'):
+        raise RuntimeError(
+            "Record factories are not supported by this version of Python, "
+            "use IsotopicFilter instead")
+
+    if _original_factory is not None:
+        return
+
+    factory = logging.getLogRecordFactory()
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.__dict__.update(current_fields())
+        return record
+
+    _original_factory = factory
+    logging.setLogRecordFactory(record_factory)
+
+
+def is_record_factory_installed():
+    return _original_factory is not None
+
+
+def uninstall_record_factory():
+    """
+    Restore factory of log records which was current before installation.
+    """
+    global _original_factory
+
+    if _original_factory is not None:
+        logging.setLogRecordFactory(_original_factory)
+        _original_factory = None
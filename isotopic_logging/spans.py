@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import random
+import threading
+
+from collections import deque
+
+from .concurrency import register_after_fork
+from .context import ScopeListener, _stack
+from .defaults import SPAN_BATCH_SIZE, SPAN_EXPORT_INTERVAL, SPAN_QUEUE_SIZE
+from .timing import time_ns
+
+
+LOG = logging.getLogger(__name__)
+
+# Kind of spans as defined by OpenTelemetry protocol
+SPAN_KIND_INTERNAL = 1
+
+# Status codes as defined by OpenTelemetry protocol
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+
+class Span(object):
+    """
+    Record of an injection scope which defines own prefix.
+
+    Times are given in nanoseconds since the epoch.
+    """
+
+    __slots__ = [
+        'trace_id', 'span_id', 'parent_id', 'name', 'prefix', 'start_time',
+        'end_time', 'thread_id', 'thread_name', 'error',
+    ]
+
+    def __init__(self, trace_id, span_id, parent_id, name, prefix, start_time,
+                 thread_id, thread_name):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.prefix = prefix
+        self.start_time = start_time
+        self.end_time = None
+        self.thread_id = thread_id
+        self.thread_name = thread_name
+        self.error = False
+
+    def to_dict(self):
+        """
+        Get representation of span which follows JSON encoding of OpenTelemetry
+        protocol.
+        """
+        result = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': [
+                {'key': "thread.id",
+                 'value': {'intValue': str(self.thread_id)}, },
+                {'key': "thread.name",
+                 'value': {'stringValue': self.thread_name}, },
+                {'key': "isotopic_logging.prefix",
+                 'value': {'stringValue': self.prefix}, },
+            ],
+            'status': {
+                'code': STATUS_CODE_ERROR if self.error else STATUS_CODE_UNSET,
+            },
+        }
+
+        if self.parent_id is not None:
+            result['parentSpanId'] = self.parent_id
+
+        return result
+
+    def __repr__(self):
+        return "<{module}.{name}('{span}' of '{trace}')>".format(
+            module=self.__class__.__module__,
+            name=self.__class__.__name__,
+            span=self.name,
+            trace=self.trace_id)
+
+
+class SpanExporter(object):
+    """
+    Base class for exporters of spans. Exporters are called by a single
+    background thread.
+    """
+
+    def export(self, spans):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class JSONLinesSpanExporter(SpanExporter):
+    """
+    Exporter which appends spans to a file, one JSON object per line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a')
+
+    def export(self, spans):
+        self._file.write(''.join([
+            json.dumps(span.to_dict(), sort_keys=True) + "\n"
+            for span in spans
+        ]))
+        self._file.flush()
+
+    def shutdown(self):
+        self._file.close()
+
+
+class SpanRecorder(ScopeListener):
+    """
+    Recorder of spans of injection scopes.
+
+    Every scope which defines own prefix gets a span. Span of a parent scope
+    is looked up in the injection stack, so spans of scopes which run within
+    restored snapshots, e.g. in executors, refer to spans of the scopes which
+    submitted them.
+
+    Finished spans are put into a bounded queue and exported by batches from
+    a background thread. Spans which do not fit into the queue are dropped
+    and counted by ``dropped`` attribute. Call `shutdown` to export pending
+    spans and stop the thread.
+    """
+
+    def __init__(self, exporter, batch_size=None, export_interval=None,
+                 queue_size=None):
+        self.exporter = exporter
+        self.batch_size = batch_size or SPAN_BATCH_SIZE
+        self.export_interval = export_interval or SPAN_EXPORT_INTERVAL
+        self.queue_size = queue_size or SPAN_QUEUE_SIZE
+        self.dropped = 0
+
+        self._queue = deque(maxlen=self.queue_size)
+        self._init_worker()
+        register_after_fork(self)
+
+    def _init_worker(self):
+        self._worker = None
+        self._stopping = False
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def _after_fork(self):
+        # Spans of parent process are exported by parent process
+        self._queue.clear()
+        self._init_worker()
+
+    def scope_entered(self, context, injector):
+        head = _stack.head
+        item, below = head[0], head[1]
+
+        if item.parent is not context:
+            # Scope reuses prefix of another scope
+            return
+
+        parent = None if below is None else getattr(below[0].parent, 'span',
+                                                    None)
+
+        if parent is None:
+            trace_id = "{0:032x}".format(random.getrandbits(128))
+            parent_id = None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+
+        thread = threading.current_thread()
+        context.span = Span(
+            trace_id, "{0:016x}".format(random.getrandbits(64)), parent_id,
+            injector.chunks[-1] if context.name is None else context.name,
+            injector.prefix, time_ns(), thread.ident, thread.name)
+
+    def scope_exited(self, context, injector, exc_type):
+        span = context.span
+
+        if span is None:
+            return
+
+        span.end_time = time_ns()
+        span.error = exc_type is not None
+
+        queue = self._queue
+
+        if len(queue) == self.queue_size:
+            self.dropped += 1
+
+        queue.append(span)
+
+        if self._worker is None:
+            self._start_worker()
+
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is not None or self._stopping:
+                return
+
+            self._worker = threading.Thread(
+                target=self._run, name="isotopic-logging-span-exporter")
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.export_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Export all pending spans.
+        """
+        queue = self._queue
+
+        with self._export_lock:
+            while queue:
+                batch = []
+
+                while queue and len(batch) < self.batch_size:
+                    batch.append(queue.popleft())
+
+                try:
+                    self.exporter.export(batch)
+                except Exception:
+                    LOG.exception("Failed to export %d spans", len(batch))
+
+    def shutdown(self):
+        """
+        Stop background thread, export pending spans and shut exporter down.
+        """
+        with self._lock:
+            self._stopping = True
+            worker = self._worker
+
+        if worker is not None:
+            self._wakeup.set()
+            worker.join()
+
+        self.flush()
+        self.exporter.shutdown()
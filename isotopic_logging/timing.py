@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Clocks used to track time spent within injection scopes.
+
+Two modes are supported:
+
+- `WALL_CLOCK` (default): time of entrance into a scope is a number of
+  seconds since the epoch as returned by ``time.time()``;
+- `MONOTONIC`: time of entrance is a `ScopeTime`, which keeps readings of a
+  monotonic high-resolution counter and of CPU time of current thread and
+  process in nanoseconds.
+
+Injectors compute elapsed time according to the kind of their enter time, so
+switching of modes does not affect scopes which have been already entered.
+"""
+
+import datetime
+import time
+
+from collections import namedtuple
+
+from .defaults import ELAPSED_TIME_FORMAT, TIMING_MODE
+
+
+WALL_CLOCK = "wall"
+MONOTONIC = "monotonic"
+
+
+def _nanoseconds(clock):
+    return lambda: int(clock() * 1000000000)
+
+
+def _unavailable():
+    return None
+
+
+time_ns = getattr(time, 'time_ns', None) or _nanoseconds(time.time)
+
+perf_counter_ns = (
+    getattr(time, 'perf_counter_ns', None) or
+    _nanoseconds(getattr(time, 'perf_counter', time.time)))
+
+thread_time_ns = (
+    getattr(time, 'thread_time_ns', None) or
+    (_nanoseconds(time.thread_time) if hasattr(time, 'thread_time') else
+     _unavailable))
+
+process_time_ns = (
+    getattr(time, 'process_time_ns', None) or
+    (_nanoseconds(time.process_time) if hasattr(time, 'process_time') else
+     _unavailable))
+
+
+class ScopeTime(namedtuple('ScopeTime', ('counter', 'thread', 'process', ))):
+    """
+    Readings of monotonic counter and CPU time clocks in nanoseconds. CPU
+    times are ``None`` if they are not supported by the platform.
+    """
+
+    __slots__ = ()
+
+
+def wall_now():
+    return time.time()
+
+
+def monotonic_now():
+    return ScopeTime(perf_counter_ns(), thread_time_ns(), process_time_ns())
+
+
+_modes = {
+    WALL_CLOCK: wall_now,
+    MONOTONIC: monotonic_now,
+}
+
+_mode = TIMING_MODE
+now = _modes[_mode]
+
+
+def set_mode(mode):
+    """
+    Set clock used to mark entrance into injection scopes.
+    """
+    global _mode, now
+
+    try:
+        now = _modes[mode]
+    except KeyError:
+        raise ValueError(
+            "Unknown timing mode '{0}', expected one of: {1}"
+            .format(mode, ", ".join(sorted(_modes))))
+
+    _mode = mode
+
+
+def get_mode():
+    return _mode
+
+
+def _difference_ns(clock, start):
+    if start is None:
+        return None
+
+    return (clock() - start) / 1e9
+
+
+def elapsed(enter_time):
+    """
+    Get seconds passed since given time of entrance into a scope.
+    """
+    if isinstance(enter_time, ScopeTime):
+        return (perf_counter_ns() - enter_time.counter) / 1e9
+
+    return time.time() - enter_time
+
+
+def thread_elapsed(enter_time):
+    """
+    Get CPU time in seconds spent by current thread since given time of
+    entrance into a scope. Returns ``None`` if CPU time is not tracked.
+    """
+    if isinstance(enter_time, ScopeTime):
+        return _difference_ns(thread_time_ns, enter_time.thread)
+
+    return None
+
+
+def process_elapsed(enter_time):
+    """
+    Get CPU time in seconds spent by current process since given time of
+    entrance into a scope. Returns ``None`` if CPU time is not tracked.
+    """
+    if isinstance(enter_time, ScopeTime):
+        return _difference_ns(process_time_ns, enter_time.process)
+
+    return None
+
+
+def to_wall_time(enter_time):
+    """
+    Convert time of entrance into a scope into seconds since the epoch, e.g.
+    to pass it to another process.
+    """
+    if isinstance(enter_time, ScopeTime):
+        return time.time() - elapsed(enter_time)
+
+    return enter_time
+
+
+# Directives of supported formats mapped to indices of duration components and
+# their formats
+_DIRECTIVES = {
+    'H': (0, "%02d"),
+    'M': (1, "%02d"),
+    'S': (2, "%02d"),
+    'f': (3, "%06d"),
+}
+_ALL_COMPONENTS = (0, 1, 2, 3, )
+
+# Cache of compiled formats. Formats which cannot be compiled map to `None`.
+_templates = {}
+
+
+def _compile_format(fmt):
+    parts, order = [], []
+    chars = iter(fmt)
+
+    for char in chars:
+        if char != '%':
+            parts.append(char)
+            continue
+
+        directive = next(chars, None)
+
+        if directive == '%':
+            parts.append("%%")
+        elif directive in _DIRECTIVES:
+            index, spec = _DIRECTIVES[directive]
+            parts.append(spec)
+            order.append(index)
+        else:
+            return None
+
+    return ''.join(parts), tuple(order)
+
+
+def format_duration(seconds, fmt=None):
+    """
+    Format duration given in seconds.
+
+    Formats which consist of ``%H``, ``%M``, ``%S``, ``%f`` and ``%%``
+    directives are rendered directly and hours are not limited by 24. Other
+    formats are rendered by ``datetime.datetime.strftime()``.
+
+    Negative durations, e.g. measured by wall clock which has been moved
+    backwards, are rendered as zero.
+    """
+    fmt = fmt or ELAPSED_TIME_FORMAT
+    seconds = max(seconds, 0)
+
+    try:
+        compiled = _templates[fmt]
+    except KeyError:
+        compiled = _templates[fmt] = _compile_format(fmt)
+
+    if compiled is None:
+        dt = datetime.datetime.utcfromtimestamp(seconds)
+        return dt.strftime(fmt)
+
+    seconds, microseconds = divmod(int(round(seconds * 1000000)), 1000000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+
+    template, order = compiled
+    values = (hours, minutes, seconds, microseconds, )
+
+    if order != _ALL_COMPONENTS:
+        values = tuple([values[i] for i in order])
+
+    return template % values
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+from functools import partial
+
+from . import context, timing
+from .concurrency import completed
+from .injectors import DirectPrefixInjector
+
+
+# Separates fields of serialized tokens. It's not expected to appear in
+# prefixes or delimiters.
+TOKEN_SEPARATOR = "\x1f"
+
+
+class ContextToken(namedtuple('ContextToken',
+                              ('chunks', 'delimiter', 'enter_time', 'oid', ))):
+    """
+    Compact representation of an injector which can be passed to other
+    processes.
+
+    Token keeps chunks of prefix, delimiter, time of entrance into the
+    original scope and OID of the injector, if any. It can be pickled or
+    serialized into a short string.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, chunks, delimiter, enter_time, oid=None):
+        return super(ContextToken, cls).__new__(
+            cls, chunks, delimiter, enter_time, oid)
+
+    @classmethod
+    def from_injector(cls, injector):
+        enter_time = injector.enter_time
+
+        if enter_time is not None:
+            # Monotonic clocks are meaningless for other processes
+            enter_time = timing.to_wall_time(enter_time)
+
+        return cls(tuple(injector.chunks), injector.delimiter, enter_time,
+                   injector.oid)
+
+    def to_injector(self):
+        prefix = ''.join([x + self.delimiter for x in self.chunks])
+        injector = DirectPrefixInjector(prefix, self.chunks, self.delimiter,
+                                        self.oid)
+        injector.enter_time = self.enter_time
+        return injector
+
+    def dumps(self):
+        enter_time = "" if self.enter_time is None else repr(self.enter_time)
+        oid = "" if self.oid is None else self.oid
+        fields = (self.delimiter, enter_time, oid, ) + tuple(self.chunks)
+        return TOKEN_SEPARATOR.join(fields)
+
+    @classmethod
+    def loads(cls, string):
+        fields = string.split(TOKEN_SEPARATOR)
+        delimiter, enter_time, oid = fields[:3]
+        enter_time = float(enter_time) if enter_time else None
+        return cls(tuple(fields[3:]), delimiter, enter_time, oid or None)
+
+
+def get_token():
+    """
+    Get token of current injector or `None` if there's no current injector.
+    """
+    item = context._stack.top
+    return None if item is None else ContextToken.from_injector(item.injector)
+
+
+class token_injector(object):
+    """
+    Context manager which restores injector from given token or its serialized
+    form as a new scope. Scope is placed on top of current stack.
+
+    Restored injector tracks time since entrance into the original scope.
+    """
+
+    def __init__(self, token):
+        if token is not None and not isinstance(token, ContextToken):
+            token = ContextToken.loads(token)
+
+        self.token = token
+
+    def __enter__(self):
+        if self.token is None:
+            return None
+
+        injector = self.token.to_injector()
+        context._stack.push(
+            context.StackItem(injector, self, context.current_owner()))
+        return injector
+
+    def __exit__(self, exc_type, value, traceback):
+        if self.token is not None:
+            context._stack.pop()
+
+    def __aenter__(self):
+        return completed(self.__enter__())
+
+    def __aexit__(self, exc_type, value, traceback):
+        return completed(self.__exit__(exc_type, value, traceback))
+
+
+def run_with_token(token, fn, *args, **kwargs):
+    """
+    Call given function within scope restored from given token.
+    """
+    with token_injector(token):
+        return fn(*args, **kwargs)
+
+
+def with_token(fn):
+    """
+    Bind given function to serialized token of current injector.
+
+    Result is picklable if given function is picklable, so it can be passed to
+    other processes, e.g., via ``ProcessPoolExecutor`` or ``multiprocessing``.
+    """
+    token = get_token()
+
+    if token is not None:
+        token = token.dumps()
+
+    return partial(run_with_token, token, fn)
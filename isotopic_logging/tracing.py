@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+import threading
+import time
+import zlib
+
+from collections import deque, namedtuple
+
+from . import timing
+from .context import ScopeListener, _stack
+from .defaults import TRACE_BUFFER_SIZE, TRACE_SAMPLE_RATE
+
+
+TraceEvent = namedtuple('TraceEvent',
+                        ('name', 'prefix', 'start', 'duration', 'thread', ))
+
+
+def _nested_events(intervals):
+    """
+    Convert intervals of scopes of a thread into speedscope events.
+
+    Intervals are tuples of start, end, index in order of exits and frame.
+    Outer scopes are exited after inner ones, so indices keep nesting of
+    scopes which start and end at the same time.
+    """
+    events, opened = [], []
+
+    def append(kind, at, frame):
+        # Keep time of events monotonic even if clock has been moved
+        if events:
+            at = max(at, events[-1]['at'])
+
+        events.append({'type': kind, 'frame': frame, 'at': at, })
+
+    for start, end, index, frame in sorted(
+            intervals, key=lambda x: (x[0], -x[1], -x[2])):
+
+        while opened and opened[-1][1] < index:
+            closed_end, _, closed_frame = opened.pop()
+            append("C", closed_end, closed_frame)
+
+        append("O", start, frame)
+        opened.append((end, index, frame))
+
+    while opened:
+        closed_end, _, closed_frame = opened.pop()
+        append("C", closed_end, closed_frame)
+
+    return events
+
+
+class TraceRecorder(ScopeListener):
+    """
+    Recorder of timelines of injection scopes.
+
+    Every scope is recorded on exit as a single event which keeps its name,
+    prefix, start time and duration in microseconds and ID of the thread.
+    Events are kept in a ring buffer of given ``capacity``: when it's full,
+    the oldest events are dropped.
+
+    Operations are sampled by their OIDs or, if they have no OIDs, randomly
+    when their top-level scopes are entered. Decision is carried by nested
+    scopes, so all scopes of an operation are either recorded or skipped
+    together, even if they run in different threads.
+    """
+
+    def __init__(self, capacity=None, sample_rate=None):
+        self.capacity = capacity or TRACE_BUFFER_SIZE
+        self.sample_rate = (
+            TRACE_SAMPLE_RATE if sample_rate is None else sample_rate)
+        self.dropped = 0
+
+        self._events = deque(maxlen=self.capacity)
+        self._sample_bound = int(self.sample_rate * 0x100000000)
+
+    def scope_entered(self, context, injector):
+        head = _stack.head
+        item, below = head[0], head[1]
+
+        if item.parent is not context:
+            # Scope reuses prefix of another scope
+            parent = item.parent
+        else:
+            parent = None if below is None else below[0].parent
+
+        key = getattr(parent, 'trace_key', None)
+
+        if key is None:
+            if injector.oid is None:
+                key = random.getrandbits(32)
+            else:
+                oid = "{0}".format(injector.oid).encode('utf-8')
+                key = zlib.crc32(oid) & 0xffffffff
+
+        context.trace_key = key
+
+    def scope_exited(self, context, injector, exc_type):
+        key = context.trace_key
+
+        # Scopes entered before registration of the recorder are skipped
+        if key is None or key >= self._sample_bound:
+            return
+
+        exit_time = time.time()
+        duration = timing.elapsed(injector.enter_time)
+        name = injector.chunks[-1] if context.name is None else context.name
+
+        # Both bounds are truncated from the same time of exit, so inner
+        # scopes never end after outer ones
+        end = int(exit_time * 1e6)
+        start = int((exit_time - duration) * 1e6)
+
+        events = self._events
+
+        if len(events) == self.capacity:
+            self.dropped += 1
+
+        events.append(TraceEvent(name, injector.prefix, start, end - start,
+                                 threading.current_thread().ident))
+
+    def events(self):
+        """
+        Get list of recorded events ordered by time of exit from scopes.
+        """
+        return list(self._events)
+
+    def clear(self):
+        self._events.clear()
+        self.dropped = 0
+
+    def to_chrome_trace(self):
+        """
+        Get recorded events in Chrome Trace Event format.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                'name': event.name,
+                'cat': "isotopic_logging",
+                'ph': "X",
+                'ts': event.start,
+                'dur': event.duration,
+                'pid': pid,
+                'tid': event.thread,
+                'args': {'prefix': event.prefix, },
+            }
+            for event in self.events()
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': "ms", }
+
+    def to_speedscope(self, name=None):
+        """
+        Get recorded events in speedscope format with a profile per thread.
+
+        Scopes within a thread are expected to be nested, e.g. scopes of
+        asyncio tasks which overlap in time cannot be exported.
+        """
+        frames, frame_indices = [], {}
+        threads = {}
+
+        for index, event in enumerate(self.events()):
+            try:
+                frame = frame_indices[event.name]
+            except KeyError:
+                frame = frame_indices[event.name] = len(frames)
+                frames.append({'name': event.name, })
+
+            threads.setdefault(event.thread, []).append(
+                (event.start, event.start + event.duration, index, frame))
+
+        profiles = []
+
+        for thread, intervals in sorted(threads.items()):
+            events = _nested_events(intervals)
+            profiles.append({
+                'type': "evented",
+                'name': "Thread {0}".format(thread),
+                'unit': "microseconds",
+                'startValue': events[0]['at'],
+                'endValue': events[-1]['at'],
+                'events': events,
+            })
+
+        return {
+            '$schema': "https://www.speedscope.app/file-format-schema.json",
+            'name': name or "isotopic_logging",
+            'shared': {'frames': frames, },
+            'profiles': profiles,
+        }
+
+    def dump_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def dump_speedscope(self, path, name=None):
+        with open(path, 'w') as f:
+            json.dump(self.to_speedscope(name), f)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of asynchronous code. They use syntax of Python 3.5+, so they are
+imported by `test_asyncio` only if version of Python is supported.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+import unittest
+
+from mock import patch
+
+from isotopic_logging import context
+from isotopic_logging.context import (
+    auto_injector, static_injector, static_scope, ScopeListener,
+)
+from isotopic_logging.logger import IsotopicLogger
+
+from .utils import patch_default_generator
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncInjectionContextTestCase(unittest.TestCase):
+
+    @patch_default_generator
+    def test_async_with(self):
+
+        async def operation():
+            async with auto_injector() as inj:
+                return inj.mark("foo")
+
+        self.assertEqual(run(operation()), "gen-1 | foo")
+
+    @patch_default_generator
+    def test_tasks_have_own_stacks(self):
+        results = []
+
+        async def operation(name):
+            with static_injector(name) as inj:
+                results.append(inj.mark("start"))
+                await asyncio.sleep(0.01)
+
+                async with auto_injector() as nested_inj:
+                    results.append(nested_inj.mark("end"))
+
+        async def main():
+            await asyncio.gather(operation("foo"), operation("bar"))
+
+        run(main())
+        self.assertEqual(sorted(results), [
+            "bar | end", "bar | start", "foo | end", "foo | start",
+        ])
+
+    @patch_default_generator
+    def test_child_tasks_inherit_prefix(self):
+
+        async def suboperation(n):
+            async with auto_injector(inherit=True) as inj:
+                await asyncio.sleep(0.01)
+                return inj.mark("task {0}".format(n))
+
+        async def operation():
+            async with static_injector("operation"):
+                return await asyncio.gather(*[
+                    asyncio.ensure_future(suboperation(n)) for n in [1, 2]
+                ])
+
+        self.assertEqual(sorted(run(operation())), [
+            "operation | gen-1 | task 1", "operation | gen-2 | task 2",
+        ])
+
+    def test_child_tasks_do_not_share_time_tracking(self):
+        results = {}
+
+        async def suboperation(delay):
+            async with static_injector("child") as inj:
+                enter_time = inj.enter_time
+                await asyncio.sleep(delay)
+                results[delay] = (inj, enter_time == inj.enter_time)
+
+        async def operation():
+            async with static_injector("parent") as inj:
+                enter_time = inj.enter_time
+                await asyncio.gather(
+                    asyncio.ensure_future(suboperation(0.02)),
+                    asyncio.ensure_future(suboperation(0.01)))
+                return inj, enter_time == inj.enter_time
+
+        inj, preserved = run(operation())
+
+        self.assertTrue(preserved)
+        self.assertEqual(sorted(results), [0.01, 0.02])
+
+        for child_inj, child_preserved in results.values():
+            self.assertTrue(child_preserved)
+            self.assertIsNot(child_inj, inj)
+            self.assertEqual(child_inj.mark("foo"), "parent | foo")
+
+    def test_threads_with_copied_context_do_not_share_time_tracking(self):
+        results = {}
+        entered = threading.Event()
+
+        def suboperation(delay):
+            with static_injector("child") as inj:
+                enter_time = inj.enter_time
+
+                if delay:
+                    entered.set()
+                    time.sleep(delay)
+                else:
+                    entered.wait()
+
+                results[delay] = (inj, enter_time == inj.enter_time)
+
+        with static_injector("parent") as inj:
+            enter_time = inj.enter_time
+            threads = [
+                threading.Thread(target=contextvars.copy_context().run,
+                                 args=(suboperation, delay))
+                for delay in [0.02, 0, ]
+            ]
+
+            for t in threads:
+                t.start()
+
+            for t in threads:
+                t.join()
+
+            self.assertEqual(inj.enter_time, enter_time)
+
+        self.assertEqual(sorted(results), [0, 0.02])
+
+        for child_inj, child_preserved in results.values():
+            self.assertTrue(child_preserved)
+            self.assertIsNot(child_inj, inj)
+            self.assertEqual(child_inj.mark("foo"), "parent | foo")
+
+    def test_nested_scope_within_same_task_reuses_injector(self):
+
+        async def operation():
+            async with static_injector("parent") as inj:
+                async with auto_injector() as nested_inj:
+                    return nested_inj is inj
+
+        self.assertTrue(run(operation()))
+
+
+class AsyncInjectionScopeTestCase(unittest.TestCase):
+
+    def test_scope_spans_whole_coroutine(self):
+
+        @static_scope("operation")
+        async def operation():
+            before = context._stack.top.injector.mark("foo")
+            await asyncio.sleep(0)
+            after = context._stack.top.injector.mark("bar")
+            return before, after
+
+        self.assertEqual(run(operation()), ("operation | foo",
+                                            "operation | bar"))
+        self.assertIsNone(context._stack.top)
+
+    def test_listeners_get_exit_after_coroutine_finishes(self):
+        events = []
+
+        class Listener(ScopeListener):
+
+            def scope_entered(self, context, injector):
+                events.append("entered")
+
+            def scope_exited(self, context, injector, exc_type):
+                events.append(("exited", exc_type))
+
+        listener = Listener()
+        context.add_listener(listener)
+        self.addCleanup(context.remove_listener, listener)
+
+        @static_scope("operation")
+        async def operation(fail):
+            await asyncio.sleep(0)
+            events.append("awaited")
+
+            if fail:
+                raise ValueError
+
+        run(operation(fail=False))
+        self.assertEqual(events, ["entered", "awaited", ("exited", None), ])
+
+        del events[:]
+
+        with self.assertRaises(ValueError):
+            run(operation(fail=True))
+
+        self.assertEqual(
+            events, ["entered", "awaited", ("exited", ValueError), ])
+        self.assertIsNone(context._stack.top)
+
+    def test_decorated_coroutine_can_be_scheduled_as_task(self):
+
+        @static_scope("child")
+        async def child():
+            await asyncio.sleep(0)
+            return context._stack.top.injector.mark("foo")
+
+        async def operation():
+            return await asyncio.ensure_future(child())
+
+        self.assertEqual(run(operation()), "child | foo")
+
+
+    def test_threads_with_copied_context_do_not_share_time_tracking(self):
+        results = []
+
+        @static_scope("helper")
+        def helper(delay):
+            inj = context._stack.top.injector
+            enter_time = inj.enter_time
+            time.sleep(delay)
+            results.append((inj, enter_time == inj.enter_time))
+
+        async def operation():
+            async with static_injector("parent") as inj:
+                enter_time = inj.enter_time
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*[
+                    loop.run_in_executor(
+                        None, contextvars.copy_context().run, helper, delay)
+                    for delay in [0.02, 0.05, ]
+                ])
+                return inj, enter_time == inj.enter_time
+
+        inj, preserved = run(operation())
+
+        self.assertTrue(preserved)
+        self.assertEqual(len(results), 2)
+
+        for helper_inj, helper_preserved in results:
+            self.assertTrue(helper_preserved)
+            self.assertIsNot(helper_inj, inj)
+            self.assertEqual(helper_inj.mark("foo"), "parent | foo")
+
+
+class AsyncIsotopicLoggerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('logging.Logger._log', return_value=None)
+        self.patched_log = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.testee = IsotopicLogger(logging.getLogger('async_logger_test'))
+
+    def test_async_with(self):
+
+        async def operation():
+            async with self.testee.static("static") as log:
+                log.error("error")
+
+        run(operation())
+        self.patched_log.assert_called_with(
+            logging.ERROR, "static | error", (),
+        )
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+# Injection stacks are local to asyncio tasks on Python 3.7+ only. Test cases
+# use syntax which cannot be even parsed by older versions.
+if sys.version_info >= (3, 7):
+    from .asyncio_cases import *  # NOQA
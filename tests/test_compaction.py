@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+from mock import Mock
+
+from isotopic_logging.compaction import (
+    digest_chunk, compact_chunks, compact_prefix, set_compaction_logger,
+    forget_reported_chains,
+)
+
+
+class CompactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = Mock()
+        set_compaction_logger(self.logger)
+        forget_reported_chains()
+
+    def tearDown(self):
+        set_compaction_logger()
+        forget_reported_chains()
+
+    def test_digest_chunk(self):
+        digest = digest_chunk("operation")
+
+        self.assertEqual(digest, "#fcb60b")
+        self.assertEqual(digest_chunk("operation"), digest)
+        self.assertNotEqual(digest_chunk("suboperation"), digest)
+
+    def test_short_chunks_are_not_compacted(self):
+        chunks = ("oid", "operation", "phase", )
+        self.assertEqual(compact_chunks(chunks, " | ", 100), chunks)
+        self.assertEqual(compact_chunks(("oid", "x" * 100), " | ", 10),
+                         ("oid", "x" * 100))
+        self.assertFalse(self.logger.log.called)
+
+    def test_middle_chunks_are_replaced_with_digests(self):
+        chunks = ("oid", "operation", "suboperation", "phase", )
+        self.assertEqual(
+            compact_prefix(chunks, " | ", 40),
+            "oid | {0} | {1} | phase | ".format(
+                digest_chunk("operation"), digest_chunk("suboperation")))
+
+    def test_middle_chunks_are_collapsed_into_single_digest(self):
+        chunks = ("oid", "operation", "suboperation", "phase", )
+        self.assertEqual(
+            compact_prefix(chunks, " | ", 20),
+            "oid | {0} | phase | ".format(
+                digest_chunk("operation | suboperation")))
+
+    def test_first_and_last_chunks_are_kept_in_full(self):
+        chunks = ("oid" * 10, "operation", "phase" * 10, )
+        self.assertEqual(
+            compact_chunks(chunks, " | ", 10),
+            ("oid" * 10, digest_chunk("operation"), "phase" * 10, ))
+
+    def test_digests_are_reported_once_per_chain(self):
+        chunks = ("oid", "operation", "suboperation", "phase", )
+        compact_chunks(chunks, " | ", 40)
+        compact_chunks(("xyz", ) + chunks[1:], " | ", 40)
+
+        mapping = {
+            digest_chunk("operation"): "operation",
+            digest_chunk("suboperation"): "suboperation",
+        }
+        self.logger.log.assert_called_once_with(
+            logging.INFO,
+            'Prefix digests: {"#c0b6cd": "suboperation", '
+            '"#fcb60b": "operation"}',
+            extra={'isotopic_digests': mapping, })
+
+        compact_chunks(chunks, " | ", 20)
+        self.assertEqual(self.logger.log.call_count, 2)
+
+    def test_reported_chains_can_be_forgotten(self):
+        chunks = ("oid", "operation", "suboperation", "phase", )
+        compact_chunks(chunks, " | ", 40)
+        forget_reported_chains()
+        compact_chunks(chunks, " | ", 40)
+
+        self.assertEqual(self.logger.log.call_count, 2)
@@ -8,7 +8,9 @@ from six.moves import range
 
 from isotopic_logging.concurrency import threadsafe_iter
 
-from .utils import integers_generator
+from .utils import (
+    integers_generator, skip_unless_fork_hooks, run_in_child_process,
+)
 
 
 @python_2_unicode_compatible
@@ -64,3 +66,27 @@ class ThreadsafeIterTestCase(unittest.TestCase):
             tester()
         except UnsafeIteratorError as e:
             self.fail(text_type(e))
+
+    @skip_unless_fork_hooks
+    def test_threadsafe_iter_after_fork(self):
+        iterator = threadsafe_iter(integers_generator())
+        lock_is_held = threading.Event()
+        release_lock = threading.Event()
+
+        def hold_lock():
+            with iterator.lock:
+                lock_is_held.set()
+                release_lock.wait()
+
+        t = threading.Thread(target=hold_lock)
+        t.start()
+        lock_is_held.wait()
+
+        try:
+            result = run_in_child_process(lambda: [str(next(iterator)), ],
+                                          timeout=5)
+        finally:
+            release_lock.set()
+            t.join()
+
+        self.assertEqual(result, ["1", ])
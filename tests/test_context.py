@@ -1,16 +1,25 @@
 # -*- coding: utf-8 -*-
 
 import itertools
+import logging
 import time
 import threading
 import unittest
+import warnings
+
+from freezegun import freeze_time
+from mock import Mock
 
 from six.moves import range
 
 from isotopic_logging.context import (
-    InjectionContext, InjectionLocalStack, direct_injector, static_injector,
-    auto_injector, hybrid_injector,
+    InjectionContext, InjectionLocalStack, InjectionContextStack,
+    direct_injector, static_injector, auto_injector, hybrid_injector,
+    contextvars, snapshot, restore, direct_scope, static_scope, auto_scope,
+    hybrid_scope, detect_stack_leaks, InjectionStackLeakWarning, _stack,
+    ScopeListener, add_listener, remove_listener, set_slow_scope_threshold,
 )
+from isotopic_logging.compaction import digest_chunk, set_compaction_logger
 from isotopic_logging.injectors import AutoprefixInjector
 
 from .utils import patch_default_generator
@@ -39,6 +48,9 @@ class InjectionLocalStackTestCase(unittest.TestCase):
         self.assertTrue(self.stack.is_empty)
         self.assertIs(result, item)
 
+    def test_pop_empty(self):
+        self.assertRaises(IndexError, self.stack.pop)
+
     def test_top(self):
         self.assertIsNone(self.stack.top)
 
@@ -46,6 +58,19 @@ class InjectionLocalStackTestCase(unittest.TestCase):
         self.stack.push(item)
         self.assertIs(self.stack.top, item)
 
+    def test_depth_and_items(self):
+        self.assertEqual(self.stack.depth, 0)
+        self.assertEqual(self.stack.items, [])
+
+        self.stack.push(1)
+        self.stack.push(2)
+        self.assertEqual(self.stack.depth, 2)
+        self.assertEqual(self.stack.items, [1, 2])
+
+        self.stack.pop()
+        self.assertEqual(self.stack.depth, 1)
+        self.assertEqual(self.stack.items, [1])
+
     def test_every_thread_has_own_stack(self):
         """
         Test every thread has own stack.
@@ -84,6 +109,25 @@ class InjectionLocalStackTestCase(unittest.TestCase):
         self.assertTrue(self.stack.is_empty)
 
 
+@unittest.skipIf(contextvars is None, "contextvars are not supported")
+class InjectionContextStackTestCase(InjectionLocalStackTestCase):
+
+    def setUp(self):
+        self.stack = InjectionContextStack()
+
+    def test_copied_context_has_own_view(self):
+        item1, item2 = object(), object()
+        self.stack.push(item1)
+
+        def worker():
+            self.assertIs(self.stack.top, item1)
+            self.stack.push(item2)
+            self.assertIs(self.stack.top, item2)
+
+        contextvars.copy_context().run(worker)
+        self.assertIs(self.stack.top, item1)
+
+
 class InjectionContextTestCase(unittest.TestCase):
 
     def test_injection_context_parallel(self):
@@ -123,6 +167,29 @@ class InjectionContextTestCase(unittest.TestCase):
             self.assertRaises(AssertionError, nested_injection)
             self.assertEqual(top_inj, injector1)
 
+    def test_context_is_pushed_on_enter(self):
+        injector = AutoprefixInjector()
+        context = InjectionContext(injector)
+        self.assertTrue(_stack.is_empty)
+
+        with context as inj:
+            self.assertIs(inj, injector)
+            self.assertIs(_stack.top.injector, injector)
+
+        self.assertTrue(_stack.is_empty)
+
+    def test_context_which_is_not_entered_does_not_leak(self):
+
+        def failure():
+            context = InjectionContext(AutoprefixInjector())  # NOQA
+            raise ValueError
+
+        self.assertRaises(ValueError, failure)
+        self.assertTrue(_stack.is_empty)
+
+        with InjectionContext(AutoprefixInjector()):
+            self.assertEqual(_stack.depth, 1)
+
     @patch_default_generator
     def test_inheritance(self):
         expected = [
@@ -181,6 +248,230 @@ class InjectionContextTestCase(unittest.TestCase):
         self.assertEqual(results, expected)
 
 
+class StackLeakDetectionTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        detect_stack_leaks(None)
+
+    def test_callback(self):
+        reports = []
+        detect_stack_leaks(2, lambda depth, items: reports.append(
+            (depth, [item.injector.prefix for item in items])))
+
+        with direct_injector("a"):
+            with direct_injector("b", inherit=True):
+                with direct_injector("c", inherit=True):
+                    pass
+
+            with direct_injector("d", inherit=True):
+                pass
+
+        self.assertEqual(reports, [
+            (2, ["a", "ab"]),
+            (2, ["a", "ad"]),
+        ])
+
+    def test_warning(self):
+        detect_stack_leaks(1)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+
+            with direct_injector("a"):
+                pass
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(
+            issubclass(caught[0].category, InjectionStackLeakWarning))
+        self.assertIn("depth 1", str(caught[0].message))
+
+    def test_detection_is_disabled(self):
+        reports = []
+        detect_stack_leaks(None, lambda *args: reports.append(args))
+
+        with direct_injector("a"):
+            pass
+
+        self.assertEqual(reports, [])
+
+
+class RecordingListener(ScopeListener):
+
+    def __init__(self):
+        self.events = []
+
+    def scope_entered(self, context, injector):
+        self.events.append(("enter", context.name, injector.prefix))
+
+    def scope_exited(self, context, injector, exc_type):
+        self.events.append(("exit", context.name, exc_type))
+
+
+class ScopeListenerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.listener = RecordingListener()
+        add_listener(self.listener)
+        self.addCleanup(remove_listener, self.listener)
+
+    def test_events(self):
+
+        def failure():
+            with hybrid_injector("operation", itertools.repeat("oid"), ":"):
+                with static_injector("phase", ":", inherit=True):
+                    with direct_injector("nested"):
+                        raise ValueError
+
+        self.assertRaises(ValueError, failure)
+        self.assertEqual(self.listener.events, [
+            ("enter", "operation", "oid:operation:"),
+            ("enter", "phase", "oid:operation:phase:"),
+            ("enter", None, "oid:operation:phase:"),
+            ("exit", None, ValueError),
+            ("exit", "phase", ValueError),
+            ("exit", "operation", ValueError),
+        ])
+
+    def test_nested_decorated_scopes_notify_listeners(self):
+
+        @static_scope("helper")
+        def helper():
+            pass
+
+        with auto_injector(itertools.repeat("oid")):
+            helper()
+
+        self.assertEqual(self.listener.events[1:3], [
+            ("enter", "helper", "oid | "),
+            ("exit", "helper", None),
+        ])
+
+
+class SlowScopeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = Mock()
+        self.addCleanup(set_slow_scope_threshold, None)
+
+    def test_threshold_of_context(self):
+        set_slow_scope_threshold(None, self.logger)
+
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with hybrid_injector("operation", itertools.repeat("oid"),
+                                 threshold=2):
+                frozen.tick(1)
+
+            self.assertFalse(self.logger.log.called)
+
+            with hybrid_injector("operation", itertools.repeat("oid"),
+                                 threshold=2):
+                frozen.tick(3)
+
+        self.logger.log.assert_called_once_with(
+            logging.WARNING,
+            "oid | operation | Slow scope 'operation' took 00:00:03.000000 "
+            "(threshold: 2s)")
+
+    def test_default_threshold(self):
+        set_slow_scope_threshold(0.5, self.logger, logging.ERROR)
+
+        @auto_scope(itertools.repeat("nested"))
+        def nested():
+            frozen.tick(1)
+
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with auto_injector(itertools.repeat("oid"), threshold=10):
+                nested()
+
+        self.logger.log.assert_called_once_with(
+            logging.ERROR, "oid | Slow scope took 00:00:01.000000 "
+            "(threshold: 0.5s)")
+
+    def test_default_threshold_is_disabled(self):
+        set_slow_scope_threshold(None, self.logger)
+
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with static_injector("operation"):
+                frozen.tick(100)
+
+        self.assertFalse(self.logger.log.called)
+
+
+class SnapshotTestCase(unittest.TestCase):
+
+    def test_empty_snapshot(self):
+        state = snapshot()
+        self.assertIsNone(state)
+
+        with restore(state) as inj:
+            self.assertIsNone(inj)
+
+            with static_injector("foo") as inj:
+                self.assertEqual(inj.mark("bar"), "foo | bar")
+
+    def test_snapshot_is_not_affected_by_changes_of_stack(self):
+        with static_injector("foo"):
+            state = snapshot()
+
+            with static_injector("bar", inherit=True):
+                self.assertIsNot(snapshot(), state)
+
+            self.assertIs(snapshot(), state)
+
+        with restore(state) as inj:
+            self.assertEqual(inj.mark("baz"), "foo | baz")
+
+    def test_restore_in_another_thread(self):
+        results = []
+
+        def worker(state):
+            with restore(state) as inj:
+                results.append(inj.mark("restored"))
+
+                with auto_injector() as nested_inj:
+                    results.append(nested_inj.mark("nested"))
+
+                with static_injector("sub", inherit=True) as inherited_inj:
+                    results.append(inherited_inj.mark("inherited"))
+
+            with static_injector("own") as inj:
+                results.append(inj.mark("after restore"))
+
+        with static_injector("foo"):
+            t = threading.Thread(target=worker, args=(snapshot(), ))
+            t.start()
+            t.join()
+
+        self.assertEqual(results, [
+            "foo | restored",
+            "foo | nested",
+            "foo | sub | inherited",
+            "own | after restore",
+        ])
+
+    def test_restore_preserves_current_stack(self):
+        with static_injector("foo"):
+            state = snapshot()
+
+        with static_injector("bar") as inj:
+            with restore(state) as restored_inj:
+                self.assertEqual(restored_inj.mark("baz"), "foo | baz")
+
+            with auto_injector() as nested_inj:
+                self.assertIs(nested_inj, inj)
+
+    def test_restored_scope_has_own_time_tracking(self):
+        with static_injector("foo") as inj:
+            state = snapshot()
+            enter_time = inj.enter_time
+
+            with restore(state) as restored_inj:
+                self.assertIsNot(restored_inj, inj)
+                self.assertIsNotNone(restored_inj.enter_time)
+
+            self.assertEqual(inj.enter_time, enter_time)
+
+
 class InjectionContextFactoriesTestCase(unittest.TestCase):
 
     def test_direct_injector(self):
@@ -326,6 +617,23 @@ class InjectionContextFactoriesTestCase(unittest.TestCase):
         operation()
         self.assertEqual(expected, results)
 
+    def test_compacted_scopes(self):
+        set_compaction_logger(Mock())
+        self.addCleanup(set_compaction_logger)
+
+        with hybrid_injector("operation", itertools.repeat("oid")):
+            with static_injector("suboperation", inherit=True):
+                with static_injector("phase", inherit=True,
+                                     max_length=20) as inj:
+                    self.assertEqual(
+                        inj.mark("foo"),
+                        "oid | {0} | phase | foo".format(
+                            digest_chunk("operation | suboperation")))
+                    self.assertEqual(
+                        inj.chunks,
+                        ("oid", digest_chunk("operation | suboperation"),
+                         "phase", ))
+
     def test_elapsed_time_is_preserved_and_relevant_only_to_current_scope(self):
         with auto_injector() as inj1:
             time.sleep(0.1)
@@ -340,3 +648,86 @@ class InjectionContextFactoriesTestCase(unittest.TestCase):
                 self.assertAlmostEqual(inj2.elapsed_time, 0.2, 1)
 
             self.assertAlmostEqual(inj1.elapsed_time, 0.3, 1)
+
+
+class InjectionScopeTestCase(unittest.TestCase):
+
+    def test_direct_scope(self):
+
+        @direct_scope("foo > ")
+        def function(message):
+            with auto_injector() as inj:
+                return inj.mark(message)
+
+        self.assertEqual(function("bar"), "foo > bar")
+        self.assertEqual(function.__name__, "function")
+
+    @patch_default_generator
+    def test_top_level_scopes(self):
+
+        @auto_scope()
+        def function():
+            with auto_injector() as inj:
+                return inj.mark("foo")
+
+        self.assertEqual(function(), "gen-1 | foo")
+        self.assertEqual(function(), "gen-2 | foo")
+
+    @patch_default_generator
+    def test_nested_scope(self):
+
+        @hybrid_scope("nested")
+        def function():
+            with auto_injector() as inj:
+                return inj.mark("foo"), inj.enter_time
+
+        with static_injector("top") as inj:
+            enter_time = inj.enter_time
+            string, nested_enter_time = function()
+
+            self.assertEqual(string, "top | foo")
+            self.assertNotEqual(nested_enter_time, enter_time)
+            self.assertEqual(inj.enter_time, enter_time)
+
+    def test_inherited_scope(self):
+
+        @static_scope("inherited", inherit=True)
+        def function():
+            with auto_injector() as inj:
+                return inj.mark("foo")
+
+        with static_injector("top"):
+            self.assertEqual(function(), "top | inherited | foo")
+
+        self.assertEqual(function(), "inherited | foo")
+
+    def test_compacted_scope(self):
+        set_compaction_logger(Mock())
+        self.addCleanup(set_compaction_logger)
+
+        @static_scope("phase", inherit=True, max_length=10)
+        def function():
+            with auto_injector() as inj:
+                return inj.mark("foo")
+
+        with static_injector("top"):
+            with static_injector("operation", inherit=True):
+                self.assertEqual(
+                    function(),
+                    "top | {0} | phase | foo".format(
+                        digest_chunk("operation")))
+
+    def test_nested_scope_failure(self):
+
+        @static_scope("nested")
+        def function():
+            raise ValueError()
+
+        with static_injector("top") as inj:
+            enter_time = inj.enter_time
+            self.assertRaises(ValueError, function)
+            self.assertEqual(inj.enter_time, enter_time)
+
+        self.assertRaises(ValueError, function)
+        self.assertTrue(InjectionLocalStack().is_empty)
+        self.assertIsNone(snapshot())
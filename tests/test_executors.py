@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from isotopic_logging.context import (
+    auto_injector, static_injector, hybrid_injector,
+)
+from isotopic_logging.executors import PropagatingExecutor
+
+from .utils import patch_default_generator
+
+
+def mark(message):
+    with auto_injector() as inj:
+        return inj.mark(message)
+
+
+class PropagatingExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_submit(self):
+        testee = PropagatingExecutor(self.executor)
+
+        with static_injector("foo"):
+            future = testee.submit(mark, "bar")
+
+        self.assertEqual(future.result(), "foo | bar")
+
+    def test_map(self):
+        testee = PropagatingExecutor(self.executor)
+
+        with static_injector("foo"):
+            results = list(testee.map(mark, ["bar", "baz", ]))
+
+        self.assertEqual(results, ["foo | bar", "foo | baz", ])
+
+    @patch_default_generator
+    def test_inherit(self):
+        testee = PropagatingExecutor(self.executor, inherit=True,
+                                     delimiter=": ")
+
+        with hybrid_injector("foo"):
+            results = list(testee.map(mark, ["bar", "baz", ]))
+
+        chunks = [x.split(" | ") for x in results]
+
+        self.assertEqual([x[:2] for x in chunks], [["gen-1", "foo"], ] * 2)
+        self.assertEqual(sorted(x[2][:-len(": ba?")] for x in chunks),
+                         ["gen-2", "gen-3", ])
+        self.assertEqual([x[2][-len("ba?"):] for x in chunks],
+                         ["bar", "baz", ])
+
+    def test_empty_scope(self):
+        testee = PropagatingExecutor(self.executor)
+
+        with static_injector("foo"):
+            testee.submit(mark, "bar").result()
+
+        future = testee.submit(mark, "baz")
+        self.assertNotIn("foo", future.result())
+
+    def test_worker_stack_is_cleaned(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        testee = PropagatingExecutor(executor)
+
+        with testee:
+            with static_injector("foo"):
+                testee.submit(mark, "bar").result()
+
+            result = executor.submit(mark, "baz").result()
+
+        self.assertNotIn("foo", result)
@@ -1,9 +1,43 @@
 # -*- coding: utf-8 -*-
 
+import threading
 import unittest
 
-from isotopic_logging.defaults import OID_LENGTH, OID_MAX_LENGTH
-from isotopic_logging.generators import generate_uuid_based_oid
+from itertools import cycle
+from freezegun import freeze_time
+from six.moves import range
+
+from isotopic_logging.defaults import (
+    OID_LENGTH, OID_MAX_LENGTH, OID_ALPHABET, OID_SHARDED_LENGTH,
+    OID_SHARD_LENGTH, OID_SHARD_PROCESS_LENGTH, OID_TIMESTAMP_LENGTH,
+)
+from isotopic_logging.generators import (
+    generate_uuid_based_oid, generate_batched_oid, generate_sharded_oid,
+    generate_time_ordered_oid, generate_unique_oid,
+    generate_adaptive_length_oid, generate_process_tagged_oid,
+    generate_snowflake_oid,
+)
+
+from .utils import (
+    skip_unless_fork_hooks, concurrent_load, run_in_child_process,
+)
+
+
+def collect_from_threads(generator, threads_count=10, calls_per_thread=100):
+    results = []
+
+    def worker():
+        results.extend(next(generator) for x in range(calls_per_thread))
+
+    threads = [threading.Thread(target=worker) for x in range(threads_count)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    return results
 
 
 class UUIDBasedOIDGeneratorTestCase(unittest.TestCase):
@@ -26,3 +60,408 @@ class UUIDBasedOIDGeneratorTestCase(unittest.TestCase):
         g = generate_uuid_based_oid(length=OID_MAX_LENGTH * 10)
         oid = next(g)
         self.assertEqual(len(oid), OID_MAX_LENGTH)
+
+
+class BatchedOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_default_length(self):
+        g = generate_batched_oid()
+        oid = next(g)
+        self.assertEqual(len(oid), OID_LENGTH)
+
+    def test_max_length(self):
+        g = generate_batched_oid(length=OID_MAX_LENGTH * 10)
+        oid = next(g)
+        self.assertEqual(len(oid), OID_MAX_LENGTH)
+
+    def test_odd_length(self):
+        g = generate_batched_oid(length=7, batch_size=3)
+        oids = [next(g) for x in range(10)]
+        self.assertEqual(set(map(len, oids)), {7, })
+
+    def test_values_are_uppercase_hex(self):
+        g = generate_batched_oid(length=OID_MAX_LENGTH)
+        oid = next(g)
+        self.assertEqual(oid, oid.upper())
+        int(oid, 16)
+
+    def test_batches_are_refilled(self):
+        g = generate_batched_oid(batch_size=4)
+        oids = [next(g) for x in range(10)]
+        self.assertEqual(len(oids), 10)
+        self.assertEqual(len(set(oids)), 10)
+
+    def test_every_thread_has_own_buffer(self):
+        g = generate_batched_oid(length=OID_MAX_LENGTH, batch_size=10)
+        results = collect_from_threads(g)
+
+        self.assertEqual(len(results), 1000)
+        self.assertEqual(len(set(results)), 1000)
+
+    @skip_unless_fork_hooks
+    def test_buffers_are_dropped_after_fork(self):
+        g = generate_batched_oid(length=OID_MAX_LENGTH)
+        next(g)
+
+        with concurrent_load(g):
+            child = run_in_child_process(lambda: [next(g) for x in range(100)])
+
+        parent = [next(g) for x in range(100)]
+
+        self.assertIsNotNone(child)
+        self.assertEqual(len(child), 100)
+        self.assertFalse(set(child) & set(parent))
+
+
+class ShardedOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_default_length(self):
+        g = generate_sharded_oid()
+        oid = next(g)
+        self.assertEqual(len(oid),
+                         OID_SHARD_PROCESS_LENGTH + OID_SHARDED_LENGTH)
+        self.assertEqual(g.shards_number * g.shard_size, 32 ** 10)
+
+    def test_process_tag(self):
+        g = generate_sharded_oid()
+        oid = next(g)
+        self.assertEqual(len(g.process_tag), OID_SHARD_PROCESS_LENGTH)
+        self.assertEqual(oid[:OID_SHARD_PROCESS_LENGTH], g.process_tag)
+
+        g = generate_sharded_oid(process_length=0)
+        self.assertEqual(len(next(g)), OID_SHARDED_LENGTH)
+
+    def test_process_id_must_fit(self):
+        self.assertRaises(ValueError, generate_sharded_oid, process_length=1)
+
+    def test_max_length(self):
+        g = generate_sharded_oid(length=OID_MAX_LENGTH * 10)
+        oid = next(g)
+        self.assertEqual(len(oid), OID_MAX_LENGTH)
+
+    def test_invalid_shard_length(self):
+        self.assertRaises(
+            ValueError, generate_sharded_oid, length=4, shard_length=4)
+
+    def test_values_use_alphabet(self):
+        g = generate_sharded_oid()
+        oid = next(g)
+        self.assertTrue(set(oid).issubset(OID_ALPHABET))
+
+    def test_thread_stays_within_own_shard(self):
+        g = generate_sharded_oid()
+        length = OID_SHARD_PROCESS_LENGTH + OID_SHARD_LENGTH
+        tags = set(next(g)[:length] for x in range(100))
+        self.assertEqual(len(tags), 1)
+
+    def test_exhausted_shard_is_replaced(self):
+        g = generate_sharded_oid(length=2, shard_length=1, process_length=0)
+        oids = [next(g) for x in range(len(OID_ALPHABET) + 1)]
+
+        self.assertEqual(len(set(oids)), len(oids))
+        self.assertNotEqual(oids[0][0], oids[-1][0])
+
+    def test_unique_across_threads(self):
+        g = generate_sharded_oid()
+        results = collect_from_threads(g, threads_count=100,
+                                       calls_per_thread=500)
+
+        self.assertEqual(len(set(results)), len(results))
+
+    def test_shards_of_dead_threads_are_reused(self):
+        g = generate_sharded_oid(length=3, shard_length=1, process_length=0)
+        results = []
+
+        def worker():
+            results.extend(next(g) for x in range(3))
+
+        for x in range(len(OID_ALPHABET) * 2):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(set(results)), len(results))
+        self.assertEqual(results[:6], ["000", "001", "002", "003", "004",
+                                       "005", ])
+
+    def test_exhausted_shards(self):
+        g = generate_sharded_oid(length=2, shard_length=1, process_length=0)
+
+        for x in range(len(OID_ALPHABET) ** 2):
+            next(g)
+
+        self.assertRaises(RuntimeError, next, g)
+
+    @skip_unless_fork_hooks
+    def test_unique_across_processes(self):
+        g = generate_sharded_oid()
+        next(g)
+
+        with concurrent_load(g):
+            child = run_in_child_process(lambda: [next(g) for x in range(100)])
+
+        parent = [next(g) for x in range(100)]
+
+        self.assertIsNotNone(child)
+        self.assertEqual(len(child), 100)
+        self.assertFalse(set(child) & set(parent))
+
+    @skip_unless_fork_hooks
+    def test_shards_of_parent_are_not_reused_after_fork(self):
+        g = generate_sharded_oid()
+        next(g)
+
+        child = run_in_child_process(lambda: [next(g) for x in range(3)])
+        parent = [next(g) for x in range(3)]
+
+        length = OID_SHARD_PROCESS_LENGTH
+        self.assertEqual([x[length:] for x in parent],
+                         ["0000000001", "0000000002", "0000000003", ])
+        self.assertEqual([x[length:] for x in child],
+                         ["0000000000", "0000000001", "0000000002", ])
+        self.assertNotEqual(child[0][:length], g.process_tag)
+
+
+class TimeOrderedOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_default_length(self):
+        g = generate_time_ordered_oid()
+        oid = next(g)
+        self.assertEqual(len(oid), OID_TIMESTAMP_LENGTH + OID_LENGTH)
+        self.assertEqual(len(oid), g.length)
+
+    def test_max_length(self):
+        g = generate_time_ordered_oid(entropy_length=OID_MAX_LENGTH * 10)
+        oid = next(g)
+        self.assertEqual(len(oid), OID_MAX_LENGTH)
+
+    def test_custom_entropy_length(self):
+        g = generate_time_ordered_oid(entropy_length=3)
+        oid = next(g)
+        self.assertEqual(len(oid), OID_TIMESTAMP_LENGTH + 3)
+
+    def test_values_are_sorted_by_time(self):
+        g = generate_time_ordered_oid()
+        oids = []
+
+        for timestamp in ["2015-01-01 00:00:00.001", "2015-01-01 00:00:00.002",
+                          "2015-01-02 00:00:00", "2016-01-01 00:00:00", ]:
+            with freeze_time(timestamp):
+                oids.extend(next(g) for x in range(10))
+
+        self.assertEqual(sorted(oids[::10]), oids[::10])
+        self.assertEqual(
+            [oid[:OID_TIMESTAMP_LENGTH] for oid in sorted(oids)],
+            [oid[:OID_TIMESTAMP_LENGTH] for oid in oids])
+
+    @freeze_time("2015-01-01 01:23:45.670000")
+    def test_get_time(self):
+        g = generate_time_ordered_oid()
+        oid = next(g)
+        self.assertAlmostEqual(g.get_time(oid), 1420075425.67, places=3)
+
+    @freeze_time("2015-01-01 01:23:45.670000")
+    def test_custom_resolution(self):
+        g = generate_time_ordered_oid(resolution=60)
+        oid = next(g)
+        self.assertEqual(g.get_time(oid), 1420075380)
+
+    @freeze_time("2015-01-01 01:23:45.678901")
+    def test_timestamp_length_depends_on_resolution(self):
+        g = generate_time_ordered_oid(resolution=0.000001)
+        self.assertEqual(g.timestamp_length, 11)
+
+        oid = next(g)
+        self.assertEqual(len(oid), 11 + OID_LENGTH)
+        self.assertAlmostEqual(g.get_time(oid), 1420075425.678901, places=6)
+
+        g = generate_time_ordered_oid(resolution=60)
+        self.assertEqual(g.timestamp_length, 6)
+
+    def test_timestamps_must_fit(self):
+        with self.assertRaises(ValueError):
+            generate_time_ordered_oid(resolution=1e-40)
+
+
+class UniqueOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_default_generator(self):
+        g = generate_unique_oid()
+        oid = next(g)
+        self.assertEqual(len(oid), OID_LENGTH)
+
+    def test_repeats_are_skipped_within_window(self):
+        g = generate_unique_oid(cycle(["foo", "foo", "bar", "baz", ]),
+                                window=2)
+        oids = [next(g) for x in range(4)]
+        self.assertEqual(oids, ["foo", "bar", "baz", "foo", ])
+
+    def test_window_is_bounded(self):
+        g = generate_unique_oid(cycle(["foo", "bar", "baz", ]), window=2)
+        [next(g) for x in range(100)]
+
+        self.assertEqual(len(g._recent), 2)
+        self.assertEqual(len(g._queue), 2)
+
+    def test_failure_if_no_unique_oids_left(self):
+        g = generate_unique_oid(cycle(["foo", "bar", ]), window=2)
+        next(g)
+        next(g)
+        self.assertRaises(RuntimeError, next, g)
+
+    def test_max_attempts(self):
+        oids = iter(["foo", "foo", "foo", "bar", ])
+        g = generate_unique_oid(oids, max_attempts=2)
+        self.assertEqual(g.max_attempts, 2)
+
+        next(g)
+        self.assertRaises(RuntimeError, next, g)
+        self.assertEqual(next(g), "bar")
+
+    def test_oids_expire_after_ttl(self):
+        g = generate_unique_oid(cycle(["foo", "bar", ]), window=10, ttl=60)
+
+        with freeze_time("2015-01-01 00:00:00"):
+            self.assertEqual([next(g), next(g)], ["foo", "bar", ])
+            self.assertRaises(RuntimeError, next, g)
+
+        with freeze_time("2015-01-01 00:01:01"):
+            self.assertEqual([next(g), next(g)], ["foo", "bar", ])
+
+    def test_unique_across_threads(self):
+        g = generate_unique_oid(generate_batched_oid(length=4), window=5000)
+        results = collect_from_threads(g, threads_count=10,
+                                       calls_per_thread=500)
+
+        self.assertEqual(len(results), 5000)
+        self.assertEqual(len(set(results)), 5000)
+
+
+class AdaptiveLengthOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_min_length(self):
+        g = generate_adaptive_length_oid(min_length=5)
+        oid = next(g)
+        self.assertEqual(len(oid), 5)
+        self.assertEqual(g.length, 5)
+
+    def test_get_length(self):
+        g = generate_adaptive_length_oid(collision_probability=0.01,
+                                         min_length=1)
+        self.assertEqual(g.get_length(1), 1)
+        self.assertEqual(g.get_length(10 ** 6), 12)
+        self.assertEqual(g.get_length(10 ** 100), OID_MAX_LENGTH)
+
+    def test_length_grows_with_rate(self):
+        g = generate_adaptive_length_oid(min_length=1)
+        lengths = [len(next(g)) for x in range(1000)]
+
+        self.assertEqual(lengths, sorted(lengths))
+        self.assertEqual(lengths[0], 1)
+        self.assertEqual(lengths[-1], g.get_length(1000))
+
+    def test_length_shrinks_after_window(self):
+        with freeze_time("2015-01-01 00:00:00"):
+            g = generate_adaptive_length_oid(window=10, min_length=1)
+            [next(g) for x in range(1000)]
+            self.assertEqual(g.length, g.get_length(1000))
+
+        with freeze_time("2015-01-01 00:00:10"):
+            [next(g) for x in range(10)]
+            self.assertEqual(g.length, g.get_length(1000))
+
+        with freeze_time("2015-01-01 00:00:20"):
+            next(g)
+            self.assertEqual(g.length, g.get_length(11))
+
+
+class ProcessTaggedOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_tag(self):
+        g = generate_process_tagged_oid(cycle(["foo", ]), tag_length=4)
+        oid = next(g)
+        self.assertEqual(len(oid), 7)
+        self.assertEqual(oid[:4], g.tag)
+        self.assertEqual(oid[4:], "foo")
+
+    def test_default_generator(self):
+        g = generate_process_tagged_oid()
+        oid = next(g)
+        self.assertEqual(len(oid), len(g.tag) + OID_LENGTH)
+
+    @skip_unless_fork_hooks
+    def test_sharded_oids_are_unique_across_processes(self):
+        g = generate_process_tagged_oid(generate_sharded_oid())
+        next(g)
+
+        with concurrent_load(g):
+            child = run_in_child_process(lambda: [next(g) for x in range(100)])
+
+        parent = [next(g) for x in range(100)]
+
+        self.assertIsNotNone(child)
+        self.assertEqual(len(child), 100)
+        self.assertFalse(set(child) & set(parent))
+        self.assertNotEqual(child[0][:len(g.tag)], g.tag)
+
+
+class SnowflakeOIDGeneratorTestCase(unittest.TestCase):
+
+    def test_default_length(self):
+        g = generate_snowflake_oid(1)
+        oid = next(g)
+        self.assertEqual(len(oid), g.length)
+
+    def test_max_length(self):
+        self.assertRaises(
+            ValueError, generate_snowflake_oid, 1,
+            counter_length=OID_MAX_LENGTH)
+
+    def test_parts(self):
+        g = generate_snowflake_oid(node_id=33, node_length=2, counter_length=3)
+        oids = [next(g) for x in range(3)]
+
+        self.assertEqual(set(oid[:2] for oid in oids), {"11", })
+        self.assertEqual(len(set(oid[2:7] for oid in oids)), 1)
+        self.assertEqual([oid[7:] for oid in oids], ["000", "001", "002", ])
+
+    def test_node_id_must_fit(self):
+        self.assertRaises(ValueError, generate_snowflake_oid, 1024)
+        self.assertRaises(ValueError, generate_snowflake_oid, -1)
+        self.assertRaises(ValueError, generate_snowflake_oid, 1025,
+                          node_length=2)
+        self.assertEqual(len(next(generate_snowflake_oid(1025,
+                                                         node_length=3))),
+                         13)
+
+    def test_process_id_must_fit(self):
+        # IDs of processes which run tests are not expected to be below 32
+        self.assertRaises(ValueError, generate_snowflake_oid, 1,
+                          process_length=1)
+
+    def test_counter_wraps(self):
+        g = generate_snowflake_oid(node_id=0, counter_length=1)
+        oids = [next(g) for x in range(len(OID_ALPHABET) + 1)]
+
+        self.assertEqual(len(set(oids)), len(OID_ALPHABET))
+        self.assertEqual(oids[0], oids[-1])
+
+    def test_unique_across_threads(self):
+        g = generate_snowflake_oid(1)
+        results = collect_from_threads(g, threads_count=100,
+                                       calls_per_thread=500)
+
+        self.assertEqual(len(set(results)), len(results))
+
+    @skip_unless_fork_hooks
+    def test_unique_across_processes(self):
+        g = generate_snowflake_oid(1)
+        next(g)
+
+        with concurrent_load(g):
+            child = run_in_child_process(lambda: [next(g) for x in range(100)])
+
+        parent = [next(g) for x in range(100)]
+
+        self.assertIsNotNone(child)
+        self.assertFalse(set(child) & set(parent))
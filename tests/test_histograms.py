@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from six.moves import range
+
+from isotopic_logging import context
+from isotopic_logging.context import (
+    static_injector, hybrid_injector, auto_injector, static_scope,
+)
+from isotopic_logging.histograms import LatencyHistogram, LatencyRegistry
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.count, 0)
+        self.assertIsNone(histogram.percentile(50))
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+
+        for i in range(1, 64):
+            histogram.record(i / 1e6)
+
+        self.assertEqual(histogram.count, 63)
+        self.assertEqual(histogram.percentile(50), 32 / 1e6)
+        self.assertEqual(histogram.percentile(100), 63 / 1e6)
+
+    def test_relative_error(self):
+        for value in [100, 1000, 12345, 10 ** 6, 3 * 10 ** 9, ]:
+            histogram = LatencyHistogram()
+            histogram.record(value / 1e6)
+
+            result = histogram.percentile(50) * 1e6
+            self.assertLessEqual(abs(result - value) / value, 1 / 32.0)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+
+        for i in range(1, 1001):
+            histogram.record(i / 1000.0)
+
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 / 32)
+        self.assertAlmostEqual(histogram.percentile(95), 0.95, delta=0.95 / 32)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 / 32)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(histogram.max, 10 ** 6)
+
+    def test_memory_is_fixed(self):
+        histogram = LatencyHistogram()
+        size = len(histogram.counts)
+
+        histogram.record(10 ** 9)
+        histogram.record(-1)
+        self.assertEqual(len(histogram.counts), size)
+        self.assertEqual(histogram.max, histogram.max_value)
+        self.assertEqual(histogram.counts[0], 1)
+
+    def test_update_and_reset(self):
+        histogram1, histogram2 = LatencyHistogram(), LatencyHistogram()
+        histogram1.record(0.001)
+        histogram2.record(0.002)
+        histogram2.record(0.003)
+
+        histogram1.update(histogram2)
+        self.assertEqual(histogram1.count, 3)
+        self.assertAlmostEqual(histogram1.percentile(100), 0.003, places=4)
+
+        histogram1.reset()
+        self.assertEqual(histogram1.count, 0)
+        self.assertEqual(histogram1.max, 0)
+        self.assertFalse(any(histogram1.counts))
+
+    def test_summary(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.000010)
+
+        self.assertEqual(histogram.summary(), {
+            'count': 1, 'max': 0.00001, 'p50': 0.00001, 'p95': 0.00001,
+            'p99': 0.00001,
+        })
+        self.assertEqual(sorted(histogram.summary([90]).keys()),
+                         ['count', 'max', 'p90'])
+
+
+class LatencyRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = LatencyRegistry()
+        context.add_listener(self.registry)
+        self.addCleanup(context.remove_listener, self.registry)
+
+    def test_named_scopes_are_recorded(self):
+        with hybrid_injector("Communication"):
+            with static_injector("Analysis", inherit=True):
+                pass
+
+            with auto_injector():
+                pass
+
+            with static_injector("Analysis"):
+                pass
+
+        self.assertEqual(self.registry.names(), ["Analysis", "Communication"])
+        self.assertEqual(self.registry.histogram("Analysis").count, 2)
+        self.assertEqual(self.registry.histogram("Communication").count, 1)
+
+    def test_decorated_scopes_are_recorded(self):
+
+        @static_scope("Analysis")
+        def analysis():
+            pass
+
+        with auto_injector():
+            analysis()
+
+        analysis()
+        self.assertEqual(self.registry.histogram("Analysis").count, 2)
+
+    def test_threads_have_own_shards(self):
+        recorded = [threading.Event() for i in range(4)]
+        finished = threading.Event()
+
+        def worker(event):
+            for i in range(100):
+                with static_injector("Analysis"):
+                    pass
+
+            event.set()
+            finished.wait()
+
+        threads = [
+            threading.Thread(target=worker, args=(event, ))
+            for event in recorded
+        ]
+
+        for t in threads:
+            t.start()
+
+        for event in recorded:
+            event.wait()
+
+        self.assertEqual(len(self.registry._threads), 4)
+        self.assertEqual(self.registry.histogram("Analysis").count, 400)
+
+        finished.set()
+
+        for t in threads:
+            t.join()
+
+    def test_shards_of_dead_threads_are_merged(self):
+
+        def worker():
+            for i in range(100):
+                with static_injector("Analysis"):
+                    pass
+
+        for i in range(8):
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join()
+
+        gc.collect()
+
+        self.assertEqual(self.registry._threads, {})
+        self.assertEqual(list(self.registry._merged), ["Analysis", ])
+        self.assertEqual(self.registry.histogram("Analysis").count, 800)
+        self.assertEqual(self.registry.names(), ["Analysis", ])
+
+    def test_dump(self):
+        self.registry.record("Analysis", 0.5)
+        self.registry.record("Analysis", 1.5)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "latency.json")
+
+        self.registry.dump(path)
+
+        with open(path) as f:
+            result = json.load(f)
+
+        self.assertEqual(list(result.keys()), ["Analysis"])
+        self.assertEqual(result["Analysis"]["count"], 2)
+        self.assertEqual(result["Analysis"]["max"], 1.5)
+        self.assertAlmostEqual(result["Analysis"]["p50"], 0.5, delta=0.5 / 32)
+
+    def test_reset(self):
+        self.registry.record("Analysis", 0.5)
+        self.registry.reset()
+        self.assertEqual(self.registry.histogram("Analysis").count, 0)
+
+    def test_removed_listener(self):
+        context.remove_listener(self.registry)
+
+        with static_injector("Analysis"):
+            pass
+
+        self.assertEqual(self.registry.names(), [])
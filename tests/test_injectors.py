@@ -6,10 +6,14 @@ import unittest
 
 from itertools import cycle
 from freezegun import freeze_time
+from mock import Mock
+
+from isotopic_logging.compaction import digest_chunk, set_compaction_logger
 
 from isotopic_logging.injectors import (
     DirectPrefixInjector, StaticPrefixInjector, AutoprefixInjector,
-    HybridPrefixInjector, merge_injectors,
+    HybridPrefixInjector, RopePrefixInjector, merge_injectors,
+    inherit_injector,
 )
 
 from .utils import patch_default_generator
@@ -43,6 +47,11 @@ class DirectPrefixInjectorTestCase(InjectorTestCaseBase):
         expected = """<isotopic_logging.injectors.DirectPrefixInjector("the_prefix")>"""
         self.assertEqual(actual, expected)
 
+    def test_chunks(self):
+        injector = DirectPrefixInjector("foo > ")
+        self.assertEqual(injector.chunks, ("foo > ", ))
+        self.assertEqual(injector.delimiter, "")
+
     def test_elapsed_time_out_context(self):
         injector = DirectPrefixInjector("prefix")
         self.assertRaises(ValueError, lambda: injector.elapsed_time)
@@ -79,9 +88,29 @@ class DirectPrefixInjectorTestCase(InjectorTestCaseBase):
         actual = injector.format_elapsed_time(custom_format)
         self.assertEqual(actual, "01/23/45")
 
+    @freeze_time("2015-01-03 01:23:45.670000")
+    def test_format_elapsed_time_longer_than_day(self):
+        injector = DirectPrefixInjector("prefix")
+
+        timetuple = time.strptime("2015-01-01 00:00:00", "%Y-%m-%d %H:%M:%S")
+        injector.enter_time = calendar.timegm(timetuple)
+
+        actual = injector.format_elapsed_time()
+        self.assertEqual(actual, "49:23:45.670000")
+
+    def test_cpu_time_out_context(self):
+        injector = DirectPrefixInjector("prefix")
+        self.assertRaises(ValueError, lambda: injector.thread_time)
+        self.assertRaises(ValueError, lambda: injector.process_time)
+
 
 class StaticPrefixInjectorTestCase(InjectorTestCaseBase):
 
+    def test_chunks(self):
+        injector = StaticPrefixInjector("foo", delimiter=":")
+        self.assertEqual(injector.chunks, ("foo", ))
+        self.assertEqual(injector.delimiter, ":")
+
     def test_delimiter_is_default(self):
         injector = StaticPrefixInjector("foo")
         expected = [
@@ -163,6 +192,12 @@ class AutoprefixInjectorTestCase(InjectorTestCaseBase):
 
 class HybridPrefixInjectorTestCase(InjectorTestCaseBase):
 
+    @patch_default_generator
+    def test_chunks(self):
+        injector = HybridPrefixInjector("static")
+        self.assertEqual(injector.chunks, ("gen-1", "static", ))
+        self.assertEqual(injector.delimiter, " | ")
+
     @patch_default_generator
     def test_all_parameters_are_default(self):
         injector = HybridPrefixInjector("static")
@@ -230,3 +265,157 @@ def test_merge_injectors():
     i3 = AutoprefixInjector()
     merged = merge_injectors(i1, i2, i3)
     assert merged.prefix == "gen-1 | suboperation | gen-2 | "
+
+
+@patch_default_generator
+def test_merge_injectors_chunks():
+    merged = merge_injectors(AutoprefixInjector(), StaticPrefixInjector("foo"))
+    assert merged.chunks == ("gen-1", "foo", )
+    assert merged.delimiter == " | "
+
+
+def test_merge_injectors_with_max_length():
+    set_compaction_logger(Mock())
+
+    try:
+        merged = merge_injectors(AutoprefixInjector(cycle(["oid"])),
+                                 StaticPrefixInjector("operation"),
+                                 StaticPrefixInjector("phase"),
+                                 max_length=16)
+    finally:
+        set_compaction_logger()
+
+    assert merged.prefix == "oid | {0} | phase | ".format(
+        digest_chunk("operation"))
+    assert merged.chunks == ("oid", digest_chunk("operation"), "phase", )
+
+
+def test_merge_injectors_with_different_delimiters():
+    merged = merge_injectors(DirectPrefixInjector("foo > "),
+                             StaticPrefixInjector("bar"))
+    assert merged.prefix == "foo > bar | "
+    assert merged.chunks == ("foo > bar | ", )
+    assert merged.delimiter == ""
+
+
+class RopePrefixInjectorTestCase(InjectorTestCaseBase):
+
+    def make_chain(self, depth):
+        injector = HybridPrefixInjector("operation", cycle(["oid"]))
+
+        for i in range(depth):
+            injector = RopePrefixInjector(
+                injector, StaticPrefixInjector("phase-{0}".format(i)))
+
+        return injector
+
+    def test_prefix_is_built_lazily(self):
+        injector = self.make_chain(3)
+        self.assertIsNone(injector._prefix)
+        self.assertIsNone(injector.parent._prefix)
+
+        self.assertEqual(injector.prefix,
+                         "oid | operation | phase-0 | phase-1 | phase-2 | ")
+        self.assertIsNone(injector.parent._prefix)
+
+    def test_mark(self):
+        injector = self.make_chain(1)
+        expected = [
+            "oid | operation | phase-0 | alpha",
+            "oid | operation | phase-0 | bravo",
+        ]
+        self.assert_mark(injector, expected)
+
+    def test_chunks(self):
+        injector = self.make_chain(2)
+        self.assertEqual(injector.chunks,
+                         ("oid", "operation", "phase-0", "phase-1", ))
+        self.assertEqual(injector.delimiter, " | ")
+
+    def test_built_parent_is_reused(self):
+        parent = self.make_chain(2)
+        parent.prefix
+        parent.chunks
+
+        injector = RopePrefixInjector(parent, StaticPrefixInjector("last"))
+        self.assertEqual(
+            injector.prefix,
+            "oid | operation | phase-0 | phase-1 | last | ")
+        self.assertEqual(
+            injector.chunks,
+            ("oid", "operation", "phase-0", "phase-1", "last", ))
+
+    def test_inherit_injector(self):
+        parent = StaticPrefixInjector("foo")
+
+        injector = inherit_injector(parent, StaticPrefixInjector("bar"))
+        self.assertIsInstance(injector, RopePrefixInjector)
+        self.assertEqual(injector.prefix, "foo | bar | ")
+
+        injector = inherit_injector(parent,
+                                    StaticPrefixInjector("bar", ":"))
+        self.assertNotIsInstance(injector, RopePrefixInjector)
+        self.assertEqual(injector.prefix, "foo | bar:")
+
+    def test_inherit_injector_with_max_length(self):
+        parent = merge_injectors(
+            HybridPrefixInjector("operation", cycle(["oid"])),
+            StaticPrefixInjector("suboperation"))
+        set_compaction_logger(Mock())
+        self.addCleanup(set_compaction_logger)
+
+        injector = inherit_injector(parent, StaticPrefixInjector("baz"), 32)
+        self.assertEqual(
+            injector.prefix,
+            "oid | {0} | {1} | baz | ".format(digest_chunk("operation"),
+                                              digest_chunk("suboperation")))
+        self.assertEqual(
+            injector.chunks,
+            ("oid", digest_chunk("operation"), digest_chunk("suboperation"),
+             "baz", ))
+        self.assertEqual(injector.oid, "oid")
+
+        injector = inherit_injector(parent, StaticPrefixInjector("baz"), 100)
+        self.assertEqual(injector.prefix,
+                         "oid | operation | suboperation | baz | ")
+
+    def test_merge_injectors_with_unexpected_arguments(self):
+        self.assertRaises(TypeError, merge_injectors,
+                          StaticPrefixInjector("foo"), length=10)
+
+
+class InjectorFieldsTestCase(unittest.TestCase):
+
+    def test_oid(self):
+        self.assertIsNone(DirectPrefixInjector("foo").oid)
+        self.assertIsNone(StaticPrefixInjector("foo").oid)
+        self.assertEqual(AutoprefixInjector(cycle(["oid"])).oid, "oid")
+        self.assertEqual(HybridPrefixInjector("foo", cycle(["oid"])).oid,
+                         "oid")
+
+    def test_oid_of_inherited_injectors(self):
+        parent = HybridPrefixInjector("foo", cycle(["oid-1"]))
+        child = AutoprefixInjector(cycle(["oid-2"]))
+
+        self.assertEqual(merge_injectors(parent, child).oid, "oid-1")
+        self.assertEqual(RopePrefixInjector(parent, child).oid, "oid-1")
+        self.assertEqual(
+            merge_injectors(StaticPrefixInjector("foo"), child).oid, "oid-2")
+        self.assertEqual(
+            RopePrefixInjector(StaticPrefixInjector("foo"), child).oid,
+            "oid-2")
+        self.assertEqual(
+            merge_injectors(DirectPrefixInjector("foo > "), child).oid,
+            "oid-2")
+
+    def test_fields(self):
+        injector = RopePrefixInjector(
+            HybridPrefixInjector("foo", cycle(["oid"])),
+            StaticPrefixInjector("bar"))
+
+        self.assertEqual(injector.fields, {
+            'isotopic_oid': "oid",
+            'isotopic_chunks': ("oid", "foo", "bar", ),
+            'isotopic_delimiter': " | ",
+            'isotopic_prefix': "oid | foo | bar | ",
+        })
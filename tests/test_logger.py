@@ -3,12 +3,16 @@
 import logging
 import unittest
 
+from freezegun import freeze_time
+from six import StringIO
 from mock import patch
 
 from isotopic_logging.injectors import (
     DirectPrefixInjector, StaticPrefixInjector, AutoprefixInjector,
     HybridPrefixInjector,
 )
+from isotopic_logging.context import static_scope
+from isotopic_logging.generators import generate_sharded_oid
 from isotopic_logging.logger import IsotopicLogger
 from isotopic_logging.proxy import LoggerProxy
 
@@ -74,3 +78,85 @@ class IsotopicLoggerTestCase(unittest.TestCase):
             self.patched_log.assert_called_with(
                 logging.DEBUG, "gen-1 | hybrid | debug", (),
             )
+
+    def test_custom_oid_generator(self):
+        generator = generate_sharded_oid(length=4, shard_length=1,
+                                         process_length=0)
+
+        with self.testee.hybrid("hybrid", oid_generator=generator) as log:
+            oid = log.injector.prefix.split(" | ")[0]
+            self.assertEqual(len(oid), 4)
+
+            log.debug("debug")
+            self.patched_log.assert_called_with(
+                logging.DEBUG, "{0} | hybrid | debug".format(oid), (),
+            )
+
+    def test_current_proxy(self):
+
+        @static_scope("scope")
+        def function():
+            self.testee.current.debug("debug")
+
+        function()
+        self.patched_log.assert_called_with(
+            logging.DEBUG, "scope | debug", (),
+        )
+
+    def test_slow_scope_is_reported_by_wrapped_logger(self):
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with self.testee.static("static", threshold=1):
+                frozen.tick(1.5)
+
+        self.patched_log.assert_called_with(
+            logging.WARNING,
+            "static | Slow scope 'static' took 00:00:01.500000 "
+            "(threshold: 1s)",
+            (),
+        )
+
+
+class StructuredIsotopicLoggerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = StringIO()
+        handler = logging.StreamHandler(self.stream)
+        handler.setFormatter(logging.Formatter(
+            "%(isotopic_oid)s %(isotopic_chunks)s %(isotopic_prefix)s"
+            "%(message)s"))
+
+        self.original = logging.getLogger('structured_logger_test')
+        self.original.addHandler(handler)
+        self.original.setLevel(logging.INFO)
+        self.original.propagate = False
+        self.addCleanup(self.original.removeHandler, handler)
+
+        self.testee = IsotopicLogger(self.original, structured=True)
+
+    def test_fields_are_passed_to_records(self):
+        with self.testee.hybrid("foo", oid_generator=iter(["oid"])) as log:
+            log.info("message")
+
+        self.assertEqual(self.stream.getvalue(),
+                         "oid ('oid', 'foo') oid | foo | message\n")
+
+    def test_current_proxy(self):
+
+        @static_scope("scope")
+        def function():
+            self.testee.current.info("message")
+
+        function()
+        self.assertEqual(self.stream.getvalue(),
+                         "None ('scope',) scope | message\n")
+
+    def test_slow_scope_is_reported_with_fields(self):
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with self.testee.hybrid("foo", oid_generator=iter(["oid"]),
+                                    threshold=1):
+                frozen.tick(1.5)
+
+        self.assertEqual(
+            self.stream.getvalue(),
+            "oid ('oid', 'foo') oid | foo | Slow scope 'foo' took "
+            "00:00:01.500000 (threshold: 1s)\n")
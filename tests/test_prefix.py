@@ -2,7 +2,14 @@
 
 import unittest
 
-from isotopic_logging.prefix import make_prefix, join_prefix
+from six.moves import range
+
+from isotopic_logging.defaults import COMPOSED_PREFIX_CACHE_SIZE
+from isotopic_logging.injectors import AutoprefixInjector
+from isotopic_logging.prefix import (
+    make_prefix, join_prefix, compose_prefix, prefix_cache_info,
+    clear_prefix_caches, lru_cache,
+)
 
 
 class PrefixTestCase(unittest.TestCase):
@@ -18,3 +25,59 @@ class PrefixTestCase(unittest.TestCase):
 
     def test_join_prefix_custom_prefix(self):
         self.assertEqual(join_prefix(["foo", "bar"], "-"), "foo-bar-")
+
+
+@unittest.skipIf(lru_cache is None, "caches are not supported")
+class PrefixCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        clear_prefix_caches()
+        self.addCleanup(clear_prefix_caches)
+
+    def test_fragments_are_shared(self):
+        prefix = make_prefix("".join(["suboperation", ]))
+        self.assertIs(make_prefix("".join(["suboperation", ])), prefix)
+
+        info = prefix_cache_info()['fragments']
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hit_rate'], 0.5)
+        self.assertEqual(info['size'], 1)
+
+    def test_composed_prefixes(self):
+        prefix = compose_prefix("D6EF95 | ", "suboperation | ")
+        self.assertEqual(prefix, "D6EF95 | suboperation | ")
+        self.assertIsNone(prefix_cache_info()['composed']['hit_rate'])
+
+    def test_composed_tails_are_shared_by_distinct_oids(self):
+        for i in range(10):
+            prefix = compose_prefix(
+                "{0:06X} | ".format(i), "operation | ", "suboperation | ")
+
+        self.assertEqual(prefix, "000009 | operation | suboperation | ")
+
+        info = prefix_cache_info()['composed']
+        self.assertEqual(info['hits'], 9)
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['size'], 1)
+
+    def test_size_is_limited(self):
+        for i in range(COMPOSED_PREFIX_CACHE_SIZE * 2):
+            compose_prefix(
+                "D6EF95 | ", "{0:06X} | ".format(i), "suboperation | ")
+
+        info = prefix_cache_info()['composed']
+        self.assertEqual(info['size'], COMPOSED_PREFIX_CACHE_SIZE)
+        self.assertEqual(info['hit_rate'], 0)
+
+    def test_oids_are_not_cached(self):
+        AutoprefixInjector()
+        self.assertEqual(prefix_cache_info()['fragments']['misses'], 0)
+
+    def test_clear(self):
+        make_prefix("foo")
+        clear_prefix_caches()
+
+        info = prefix_cache_info()['fragments']
+        self.assertEqual(info['size'], 0)
+        self.assertIsNone(info['hit_rate'])
@@ -1,15 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import calendar
+import itertools
 import logging
 import time
 import unittest
 
 from freezegun import freeze_time
-from mock import patch
+from mock import PropertyMock, patch
 
+from isotopic_logging.context import static_injector, hybrid_injector
 from isotopic_logging.injectors import StaticPrefixInjector
-from isotopic_logging.proxy import LoggerProxy
+from isotopic_logging.proxy import LoggerProxy, CurrentLoggerProxy
 
 
 class LoggerProxyTestCase(unittest.TestCase):
@@ -70,3 +72,115 @@ class LoggerProxyTestCase(unittest.TestCase):
             logging.ERROR, "proxy test | exception", (), exc_info=1,
         )
         self.assertIn("exception", self.testee.__dict__)
+
+    def test_disabled_level(self):
+        self.original.setLevel(logging.INFO)
+        self.addCleanup(self.original.setLevel, logging.NOTSET)
+
+        with patch.object(StaticPrefixInjector, 'mark') as mark:
+            self.testee.debug("debug")
+
+        self.assertFalse(mark.called)
+        self.assertFalse(self.patched_log.called)
+
+        self.testee.info("info")
+        self.patched_log.assert_called_with(
+            logging.INFO, "proxy test | info", (),
+        )
+
+    def test_level_is_checked_on_every_call(self):
+        self.original.setLevel(logging.INFO)
+        self.addCleanup(self.original.setLevel, logging.NOTSET)
+
+        self.testee.debug("debug")
+        self.assertFalse(self.patched_log.called)
+
+        self.original.setLevel(logging.DEBUG)
+        self.testee.debug("debug")
+        self.patched_log.assert_called_with(
+            logging.DEBUG, "proxy test | debug", (),
+        )
+
+
+class StructuredLoggerProxyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('logging.Logger._log', return_value=None)
+        self.patched_log = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.original = logging.getLogger('structured_logger_proxy_test')
+        self.injector = StaticPrefixInjector("proxy test")
+        self.testee = LoggerProxy(self.original, self.injector,
+                                  structured=True)
+
+    def test_fields_are_passed_as_extra(self):
+        self.testee.info("info %s", "arg")
+        self.patched_log.assert_called_with(
+            logging.INFO, "info %s", ("arg", ),
+            extra={
+                'isotopic_oid': None,
+                'isotopic_chunks': ("proxy test", ),
+                'isotopic_delimiter': " | ",
+                'isotopic_prefix': "proxy test | ",
+            })
+
+    def test_extra_is_preserved(self):
+        self.testee.exception("exception", extra={'foo': "bar"})
+        self.patched_log.assert_called_with(
+            logging.ERROR, "exception", (), exc_info=True,
+            extra={
+                'isotopic_oid': None,
+                'isotopic_chunks': ("proxy test", ),
+                'isotopic_delimiter': " | ",
+                'isotopic_prefix': "proxy test | ",
+                'foo': "bar",
+            })
+
+    def test_disabled_level(self):
+        self.original.setLevel(logging.INFO)
+        self.addCleanup(self.original.setLevel, logging.NOTSET)
+
+        with patch.object(StaticPrefixInjector, 'fields',
+                          new_callable=PropertyMock) as fields:
+            self.testee.debug("debug")
+
+        self.assertFalse(fields.called)
+        self.assertFalse(self.patched_log.called)
+
+    def test_current_injector(self):
+        testee = CurrentLoggerProxy(self.original, structured=True)
+
+        with hybrid_injector("foo", itertools.repeat("oid")):
+            testee.info("info")
+
+        extra = self.patched_log.call_args[1]['extra']
+        self.assertEqual(extra['isotopic_oid'], "oid")
+        self.assertEqual(extra['isotopic_chunks'], ("oid", "foo", ))
+
+
+class CurrentLoggerProxyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('logging.Logger._log', return_value=None)
+        self.patched_log = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.original = logging.getLogger('current_logger_proxy_test')
+        self.testee = CurrentLoggerProxy(self.original)
+
+    def test_current_injector(self):
+        with static_injector("foo"):
+            self.testee.info("info")
+
+        self.patched_log.assert_called_with(logging.INFO, "foo | info", (), )
+
+        with static_injector("bar") as inj:
+            self.assertIs(self.testee.injector, inj)
+            self.testee.info("info")
+
+        self.patched_log.assert_called_with(logging.INFO, "bar | info", (), )
+
+    def test_no_current_injector(self):
+        self.testee.info("info")
+        self.patched_log.assert_called_with(logging.INFO, "info", (), )
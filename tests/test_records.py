@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import logging
+import unittest
+
+from freezegun import freeze_time
+from six import StringIO
+
+from isotopic_logging.context import hybrid_injector, static_injector
+from isotopic_logging.injectors import StaticPrefixInjector
+from isotopic_logging.logger import IsotopicLogger
+from isotopic_logging.proxy import LoggerProxy
+from isotopic_logging.records import (
+    IsotopicFilter, current_fields, install_record_factory,
+    uninstall_record_factory,
+)
+
+
+FORMAT = "%(isotopic_prefix)s%(message)s (OID: %(isotopic_oid)s)"
+
+
+class RecordsTestCaseBase(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = StringIO()
+        self.handler = logging.StreamHandler(self.stream)
+        self.handler.setFormatter(logging.Formatter(FORMAT))
+
+        self.logger = logging.getLogger(
+            "records_test.{0}".format(self.__class__.__name__))
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.setLevel(logging.NOTSET)
+        self.logger.propagate = True
+
+    def assertLogged(self, expected):
+        self.assertEqual(self.stream.getvalue().splitlines(), expected)
+
+    def log_within_scopes(self):
+        self.logger.info("outside")
+
+        with hybrid_injector("foo", itertools.repeat("oid")):
+            self.logger.info("top")
+
+            with static_injector("bar", inherit=True):
+                self.logger.info("inherited")
+
+        self.assertLogged([
+            "outside (OID: None)",
+            "oid | foo | top (OID: oid)",
+            "oid | foo | bar | inherited (OID: oid)",
+        ])
+
+
+class CurrentFieldsTestCase(unittest.TestCase):
+
+    def test_current_fields(self):
+        self.assertEqual(current_fields()['isotopic_prefix'], "")
+
+        with static_injector("foo"):
+            self.assertEqual(current_fields(), {
+                'isotopic_oid': None,
+                'isotopic_chunks': ("foo", ),
+                'isotopic_delimiter': " | ",
+                'isotopic_prefix': "foo | ",
+            })
+
+
+class IsotopicFilterTestCase(RecordsTestCaseBase):
+
+    def setUp(self):
+        super(IsotopicFilterTestCase, self).setUp()
+        self.handler.addFilter(IsotopicFilter())
+
+    def test_filter(self):
+        self.log_within_scopes()
+
+    def test_fields_of_structured_proxies_are_kept(self):
+        proxy = LoggerProxy(self.logger, StaticPrefixInjector("proxy"),
+                            structured=True)
+
+        with static_injector("current"):
+            proxy.info("message")
+
+        self.assertLogged(["proxy | message (OID: None)"])
+
+
+@unittest.skipUnless(hasattr(logging, 'setLogRecordFactory'),
+                     "record factories are not supported")
+class RecordFactoryTestCase(RecordsTestCaseBase):
+
+    def setUp(self):
+        super(RecordFactoryTestCase, self).setUp()
+        self.original_factory = logging.getLogRecordFactory()
+        install_record_factory()
+        self.addCleanup(uninstall_record_factory)
+
+    def test_record_factory(self):
+        self.log_within_scopes()
+
+    def test_structured_proxy(self):
+        proxy = LoggerProxy(self.logger, StaticPrefixInjector("proxy"),
+                            structured=True)
+
+        with static_injector("current"):
+            proxy.info("message", extra={'foo': "bar"})
+            self.logger.info("bare")
+
+        self.assertLogged([
+            "proxy | message (OID: None)",
+            "current | bare (OID: None)",
+        ])
+
+    def test_structured_isotopic_logger(self):
+        log = IsotopicLogger(self.logger, structured=True)
+
+        with log.hybrid("foo", itertools.repeat("oid")) as proxy:
+            proxy.info("message")
+
+        self.logger.info("outside")
+
+        self.assertLogged([
+            "oid | foo | message (OID: oid)",
+            "outside (OID: None)",
+        ])
+
+    def test_slow_scope_of_structured_isotopic_logger(self):
+        log = IsotopicLogger(self.logger, structured=True)
+
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with log.hybrid("foo", itertools.repeat("oid"), threshold=1):
+                frozen.tick(1.5)
+
+        self.assertLogged([
+            "oid | foo | Slow scope 'foo' took 00:00:01.500000 "
+            "(threshold: 1s) (OID: oid)",
+        ])
+
+    def test_install_twice(self):
+        factory = logging.getLogRecordFactory()
+        install_record_factory()
+        self.assertIs(logging.getLogRecordFactory(), factory)
+
+    def test_uninstall(self):
+        uninstall_record_factory()
+        self.assertIs(logging.getLogRecordFactory(), self.original_factory)
+
+        uninstall_record_factory()
+        self.assertIs(logging.getLogRecordFactory(), self.original_factory)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from six.moves import range
+
+from isotopic_logging import context
+from isotopic_logging.context import (
+    auto_injector, static_injector, hybrid_injector,
+)
+from isotopic_logging.spans import (
+    Span, SpanExporter, SpanRecorder, JSONLinesSpanExporter,
+)
+
+
+class MemorySpanExporter(SpanExporter):
+
+    def __init__(self):
+        self.batches = []
+        self.is_shut_down = False
+        self.exported = threading.Event()
+
+    def export(self, spans):
+        self.batches.append(spans)
+        self.exported.set()
+
+    def shutdown(self):
+        self.is_shut_down = True
+
+    @property
+    def spans(self):
+        return [span for batch in self.batches for span in batch]
+
+
+def nested_helper():
+    with auto_injector():
+        pass
+
+
+class SpanRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = MemorySpanExporter()
+        self.recorder = self.start_recording(self.exporter)
+
+    def start_recording(self, exporter, **kwargs):
+        recorder = SpanRecorder(exporter, **kwargs)
+        context.add_listener(recorder)
+        self.addCleanup(context.remove_listener, recorder)
+        self.addCleanup(recorder.shutdown)
+        return recorder
+
+    def test_spans_of_scopes_with_own_prefixes(self):
+
+        def failure():
+            with hybrid_injector("operation", itertools.repeat("oid")):
+                with static_injector("phase", inherit=True):
+                    nested_helper()
+
+                with static_injector("another phase", inherit=True):
+                    raise ValueError
+
+        self.assertRaises(ValueError, failure)
+        self.recorder.shutdown()
+
+        self.assertTrue(self.exporter.is_shut_down)
+        phase, another_phase, operation = self.exporter.spans
+
+        self.assertEqual(operation.name, "operation")
+        self.assertEqual(operation.prefix, "oid | operation | ")
+        self.assertIsNone(operation.parent_id)
+        self.assertTrue(operation.error)
+
+        self.assertEqual(phase.name, "phase")
+        self.assertEqual(phase.prefix, "oid | operation | phase | ")
+        self.assertEqual(phase.parent_id, operation.span_id)
+        self.assertEqual(phase.trace_id, operation.trace_id)
+        self.assertFalse(phase.error)
+
+        self.assertEqual(another_phase.parent_id, operation.span_id)
+        self.assertNotEqual(another_phase.span_id, phase.span_id)
+        self.assertTrue(another_phase.error)
+
+        for span in [phase, another_phase, operation, ]:
+            self.assertLessEqual(operation.start_time, span.start_time)
+            self.assertLessEqual(span.start_time, span.end_time)
+            self.assertLessEqual(span.end_time, operation.end_time)
+            self.assertEqual(span.thread_id, threading.current_thread().ident)
+
+    def test_top_level_scopes_have_own_traces(self):
+        for i in range(2):
+            with auto_injector():
+                pass
+
+        self.recorder.shutdown()
+        span1, span2 = self.exporter.spans
+        self.assertNotEqual(span1.trace_id, span2.trace_id)
+        self.assertEqual(len(span1.trace_id), 32)
+        self.assertEqual(len(span1.span_id), 16)
+
+    def test_parent_in_another_thread(self):
+
+        def task(state):
+            with context.restore(state):
+                with auto_injector(inherit=True):
+                    nested_helper()
+
+        with static_injector("operation"):
+            thread = threading.Thread(target=task, args=(context.snapshot(), ))
+            thread.start()
+            thread.join()
+
+        self.recorder.shutdown()
+        task, operation = self.exporter.spans
+        self.assertEqual(task.parent_id, operation.span_id)
+        self.assertEqual(task.trace_id, operation.trace_id)
+        self.assertNotEqual(task.thread_id, operation.thread_id)
+
+    def test_spans_are_exported_by_batches_in_background(self):
+        exporter = MemorySpanExporter()
+        recorder = self.start_recording(exporter, batch_size=2,
+                                        export_interval=60)
+
+        for i in range(2):
+            with auto_injector():
+                pass
+
+        self.assertTrue(exporter.exported.wait(5))
+        self.assertEqual(len(exporter.batches[0]), 2)
+        self.assertIsNot(recorder._worker, threading.current_thread())
+
+    def test_overflow(self):
+        exporter = MemorySpanExporter()
+        recorder = self.start_recording(exporter, queue_size=2,
+                                        export_interval=60)
+
+        # Stop worker, so queue is not drained
+        recorder._stopping = True
+
+        for i in range(5):
+            with static_injector("phase-{0}".format(i)):
+                pass
+
+        self.assertEqual(recorder.dropped, 3)
+        recorder.flush()
+        self.assertEqual([x.name for x in exporter.spans],
+                         ["phase-3", "phase-4"])
+
+
+class SpanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.span = Span("0" * 31 + "1", "0" * 15 + "2", "0" * 15 + "3",
+                         "phase", "oid | phase | ", 1000, 42, "MainThread")
+        self.span.end_time = 2000
+
+    def test_to_dict(self):
+        self.assertEqual(self.span.to_dict(), {
+            'traceId': "00000000000000000000000000000001",
+            'spanId': "0000000000000002",
+            'parentSpanId': "0000000000000003",
+            'name': "phase",
+            'kind': 1,
+            'startTimeUnixNano': "1000",
+            'endTimeUnixNano': "2000",
+            'attributes': [
+                {'key': "thread.id", 'value': {'intValue': "42"}},
+                {'key': "thread.name", 'value': {'stringValue': "MainThread"}},
+                {'key': "isotopic_logging.prefix",
+                 'value': {'stringValue': "oid | phase | "}},
+            ],
+            'status': {'code': 0},
+        })
+
+    def test_root_span_has_no_parent(self):
+        self.span.parent_id = None
+        self.span.error = True
+
+        result = self.span.to_dict()
+        self.assertNotIn('parentSpanId', result)
+        self.assertEqual(result['status'], {'code': 2})
+
+    def test_json_lines_exporter(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "spans.jsonl")
+
+        exporter = JSONLinesSpanExporter(path)
+        exporter.export([self.span, self.span])
+        exporter.shutdown()
+
+        with open(path) as f:
+            lines = f.readlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), self.span.to_dict())
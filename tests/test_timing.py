@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+
+from isotopic_logging import timing
+from isotopic_logging.context import auto_injector
+from isotopic_logging.timing import (
+    ScopeTime, set_mode, get_mode, elapsed, thread_elapsed, process_elapsed,
+    to_wall_time, format_duration, WALL_CLOCK, MONOTONIC,
+)
+
+
+def burn_cpu(duration):
+    deadline = time.time() + duration
+
+    while time.time() < deadline:
+        pass
+
+
+class TimingModeTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        set_mode(WALL_CLOCK)
+
+    def test_default_mode(self):
+        self.assertEqual(get_mode(), WALL_CLOCK)
+        self.assertIsInstance(timing.now(), float)
+
+    def test_monotonic_mode(self):
+        set_mode(MONOTONIC)
+        self.assertEqual(get_mode(), MONOTONIC)
+        self.assertIsInstance(timing.now(), ScopeTime)
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, set_mode, "foo")
+        self.assertEqual(get_mode(), WALL_CLOCK)
+
+    def test_scopes_are_tracked_by_monotonic_clock(self):
+        set_mode(MONOTONIC)
+
+        with auto_injector() as inj:
+            self.assertIsInstance(inj.enter_time, ScopeTime)
+            burn_cpu(0.02)
+            time.sleep(0.05)
+
+            self.assertGreaterEqual(inj.elapsed_time, 0.07)
+            self.assertGreaterEqual(inj.thread_time, 0.01)
+            self.assertLess(inj.thread_time, 0.05)
+            self.assertGreaterEqual(inj.process_time, 0.01)
+
+    def test_cpu_time_is_not_tracked_by_wall_clock(self):
+        with auto_injector() as inj:
+            self.assertIsNone(inj.thread_time)
+            self.assertIsNone(inj.process_time)
+
+    def test_scope_entered_before_change_of_mode(self):
+        with auto_injector() as inj:
+            set_mode(MONOTONIC)
+            self.assertGreaterEqual(inj.elapsed_time, 0)
+            self.assertIsNone(inj.thread_time)
+
+
+class ElapsedTestCase(unittest.TestCase):
+
+    def test_wall_clock(self):
+        enter_time = time.time() - 10
+        self.assertAlmostEqual(elapsed(enter_time), 10, places=1)
+        self.assertIsNone(thread_elapsed(enter_time))
+        self.assertIsNone(process_elapsed(enter_time))
+
+    def test_monotonic(self):
+        enter_time = ScopeTime(timing.perf_counter_ns() - 10 ** 10, None,
+                               None)
+        self.assertAlmostEqual(elapsed(enter_time), 10, places=1)
+        self.assertIsNone(thread_elapsed(enter_time))
+        self.assertIsNone(process_elapsed(enter_time))
+
+    def test_to_wall_time(self):
+        now = time.time()
+        self.assertEqual(to_wall_time(now), now)
+
+        enter_time = ScopeTime(timing.perf_counter_ns() - 10 ** 10, None,
+                               None)
+        self.assertAlmostEqual(to_wall_time(enter_time), now - 10, places=1)
+
+
+class FormatDurationTestCase(unittest.TestCase):
+
+    def test_default_format(self):
+        self.assertEqual(format_duration(5025.67), "01:23:45.670000")
+        self.assertEqual(format_duration(0), "00:00:00.000000")
+
+    def test_rounding(self):
+        self.assertEqual(format_duration(59.9999996), "00:01:00.000000")
+
+    def test_negative_duration(self):
+        self.assertEqual(format_duration(-0.5), "00:00:00.000000")
+        self.assertEqual(format_duration(-0.5, "%d %H:%M"), "01 00:00")
+
+    def test_more_than_day(self):
+        self.assertEqual(format_duration(2 * 86400 + 3661.5),
+                         "49:01:01.500000")
+
+    def test_custom_format(self):
+        self.assertEqual(format_duration(5025.67, "%H/%M/%S"), "01/23/45")
+        self.assertEqual(format_duration(5025.67, "{%S}%% %f"),
+                         "{45}% 670000")
+
+    def test_unsupported_directives(self):
+        self.assertEqual(format_duration(86400 + 5025.67, "%d %H:%M"),
+                         "02 01:23")
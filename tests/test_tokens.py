@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+from freezegun import freeze_time
+from mock import Mock
+
+from isotopic_logging.compaction import digest_chunk, set_compaction_logger
+
+from isotopic_logging.context import (
+    static_injector, hybrid_injector, auto_injector,
+)
+from isotopic_logging.timing import set_mode, MONOTONIC, WALL_CLOCK
+from isotopic_logging.tokens import (
+    ContextToken, get_token, token_injector, with_token,
+)
+
+from .utils import patch_default_generator
+
+
+def mark(message):
+    with auto_injector() as inj:
+        return inj.mark(message)
+
+
+class ContextTokenTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.token = ContextToken(("D6EF95", "Communication", ), " | ",
+                                  1420075425.67, "D6EF95")
+
+    def test_dumps_and_loads(self):
+        string = self.token.dumps()
+        self.assertEqual(
+            string, "\x1f".join([" | ", "1420075425.67", "D6EF95", "D6EF95",
+                                 "Communication", ]))
+        self.assertEqual(ContextToken.loads(string), self.token)
+
+    def test_dumps_and_loads_without_enter_time(self):
+        token = self.token._replace(enter_time=None)
+        self.assertEqual(ContextToken.loads(token.dumps()), token)
+
+    def test_dumps_and_loads_without_oid(self):
+        token = ContextToken(("Communication", ), " | ", None)
+        self.assertIsNone(token.oid)
+
+        string = token.dumps()
+        self.assertEqual(string, "\x1f".join([" | ", "", "", "Communication"]))
+        self.assertEqual(ContextToken.loads(string), token)
+
+    def test_pickle(self):
+        result = pickle.loads(pickle.dumps(self.token))
+        self.assertEqual(result, self.token)
+
+    def test_to_injector(self):
+        injector = self.token.to_injector()
+        self.assertEqual(injector.mark("foo"), "D6EF95 | Communication | foo")
+        self.assertEqual(injector.chunks, self.token.chunks)
+        self.assertEqual(injector.delimiter, self.token.delimiter)
+        self.assertEqual(injector.enter_time, self.token.enter_time)
+        self.assertEqual(injector.oid, "D6EF95")
+
+
+class TokenHelpersTestCase(unittest.TestCase):
+
+    def test_no_token_out_of_scope(self):
+        self.assertIsNone(get_token())
+
+        with token_injector(None) as inj:
+            self.assertIsNone(inj)
+
+    @patch_default_generator
+    def test_get_token(self):
+        with hybrid_injector("operation"):
+            with static_injector("phase", inherit=True) as inj:
+                token = get_token()
+                enter_time = inj.enter_time
+
+        self.assertEqual(token.chunks, ("gen-1", "operation", "phase", ))
+        self.assertEqual(token.delimiter, " | ")
+        self.assertEqual(token.enter_time, enter_time)
+        self.assertEqual(token.oid, "gen-1")
+
+    def test_get_token_of_monotonic_scope(self):
+        set_mode(MONOTONIC)
+        self.addCleanup(set_mode, WALL_CLOCK)
+
+        with static_injector("operation") as inj:
+            token = get_token()
+            self.assertIsInstance(token.enter_time, float)
+            self.assertAlmostEqual(token.enter_time,
+                                   time.time() - inj.elapsed_time, places=2)
+
+        self.assertEqual(ContextToken.loads(token.dumps()), token)
+
+    def test_token_injector(self):
+        with freeze_time("2015-01-01 00:00:00"):
+            with static_injector("operation"):
+                token = get_token().dumps()
+
+        with freeze_time("2015-01-01 00:01:00"):
+            with token_injector(token) as inj:
+                self.assertEqual(inj.mark("foo"), "operation | foo")
+                self.assertIsNone(inj.oid)
+                self.assertEqual(mark("bar"), "operation | bar")
+                self.assertAlmostEqual(inj.elapsed_time, 60)
+
+            self.assertNotIn("operation", mark("baz"))
+
+    @patch_default_generator
+    def test_token_injector_keeps_oid(self):
+        with hybrid_injector("operation"):
+            token = get_token().dumps()
+
+        with token_injector(token) as inj:
+            self.assertEqual(inj.oid, "gen-1")
+            self.assertEqual(inj.fields['isotopic_oid'], "gen-1")
+
+    def test_token_of_compacted_scope(self):
+        set_compaction_logger(Mock())
+        self.addCleanup(set_compaction_logger)
+
+        with static_injector("root"):
+            with static_injector("a" * 30, inherit=True):
+                with static_injector("b" * 30, inherit=True):
+                    with static_injector("leaf", inherit=True,
+                                         max_length=40) as inj:
+                        token = get_token().dumps()
+                        expected = inj.mark("foo")
+
+        self.assertEqual(
+            expected,
+            "root | {0} | {1} | leaf | foo".format(digest_chunk("a" * 30),
+                                                   digest_chunk("b" * 30)))
+
+        with token_injector(token) as inj:
+            self.assertEqual(inj.mark("foo"), expected)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "fork is not supported")
+    def test_with_token_in_process_pool(self):
+        kwargs = {}
+
+        # Context of processes can be passed to executors on Python 3.7+
+        if sys.version_info >= (3, 7):
+            kwargs['mp_context'] = multiprocessing.get_context('fork')
+
+        with ProcessPoolExecutor(max_workers=1, **kwargs) as executor:
+            with static_injector("operation"):
+                future = executor.submit(with_token(mark), "foo")
+
+            self.assertEqual(future.result(), "operation | foo")
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from freezegun import freeze_time
+from mock import Mock, patch
+from six.moves import range
+
+from isotopic_logging import context
+from isotopic_logging.context import (
+    auto_injector, static_injector, hybrid_injector,
+)
+from isotopic_logging.tracing import TraceRecorder
+
+
+class TraceRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = TraceRecorder()
+        self.start_recording(self.recorder)
+
+    def start_recording(self, recorder):
+        context.add_listener(recorder)
+        self.addCleanup(context.remove_listener, recorder)
+
+    def record_operation(self):
+        with freeze_time("2015-01-01 00:00:00") as frozen:
+            with hybrid_injector("operation", itertools.repeat("oid")):
+                frozen.tick(1)
+
+                with static_injector("phase", inherit=True):
+                    frozen.tick(2)
+
+                    with auto_injector():
+                        frozen.tick(3)
+
+                frozen.tick(4)
+
+    def test_events(self):
+        self.record_operation()
+
+        start = 1420070400 * 10 ** 6
+        thread = threading.current_thread().ident
+        self.assertEqual(
+            [tuple(x) for x in self.recorder.events()],
+            [
+                ("phase", "oid | operation | phase | ", start + 3 * 10 ** 6,
+                 3 * 10 ** 6, thread),
+                ("phase", "oid | operation | phase | ", start + 1 * 10 ** 6,
+                 5 * 10 ** 6, thread),
+                ("operation", "oid | operation | ", start, 10 * 10 ** 6,
+                 thread),
+            ])
+
+    def test_ring_buffer_drops_oldest_events(self):
+        recorder = TraceRecorder(capacity=3)
+        self.start_recording(recorder)
+
+        for i in range(5):
+            with static_injector("phase-{0}".format(i)):
+                pass
+
+        self.assertEqual([x.name for x in recorder.events()],
+                         ["phase-2", "phase-3", "phase-4"])
+        self.assertEqual(recorder.dropped, 2)
+
+        recorder.clear()
+        self.assertEqual(recorder.events(), [])
+        self.assertEqual(recorder.dropped, 0)
+
+    def test_sampling_keeps_operations_whole(self):
+        recorder = TraceRecorder(sample_rate=0.5)
+        self.start_recording(recorder)
+        oids = ["{0:04X}".format(i) for i in range(200)]
+
+        for oid in oids:
+            with hybrid_injector("operation", itertools.repeat(oid)):
+                with static_injector("phase", inherit=True):
+                    pass
+
+        recorded = [x.prefix.split(" | ")[0] for x in recorder.events()]
+        self.assertGreater(len(set(recorded)), 50)
+        self.assertLess(len(set(recorded)), 150)
+
+        for oid in set(recorded):
+            self.assertEqual(recorded.count(oid), 2)
+
+    def test_operations_without_oids_are_sampled_randomly(self):
+        recorder = TraceRecorder(sample_rate=0.5)
+        self.start_recording(recorder)
+
+        for i in range(200):
+            with static_injector("Batch"):
+                with static_injector("phase", inherit=True):
+                    pass
+
+        names = [x.name for x in recorder.events()]
+        self.assertGreater(names.count("Batch"), 50)
+        self.assertLess(names.count("Batch"), 150)
+        self.assertEqual(names.count("Batch"), names.count("phase"))
+
+        for i in range(0, len(names), 2):
+            self.assertEqual(names[i:i + 2], ["phase", "Batch", ])
+
+    def test_sampling_is_kept_by_restored_scopes(self):
+        recorder = TraceRecorder(sample_rate=0.5)
+        self.start_recording(recorder)
+
+        def task(snapshot):
+            with context.restore(snapshot):
+                with static_injector("task", inherit=True):
+                    pass
+
+        for i in range(50):
+            with static_injector("operation-{0}".format(i)):
+                t = threading.Thread(target=task, args=(context.snapshot(), ))
+                t.start()
+                t.join()
+
+        operations = set(x.prefix.split(" | ")[0] for x in recorder.events())
+        tasks = set(x.prefix.split(" | ")[0] for x in recorder.events()
+                    if x.name == "task")
+        self.assertTrue(tasks)
+        self.assertEqual(tasks, operations)
+
+    def test_skipped_scopes_do_not_build_prefixes(self):
+        context.remove_listener(self.recorder)
+
+        recorder = TraceRecorder(sample_rate=0)
+        self.start_recording(recorder)
+
+        with static_injector("operation"):
+            with static_injector("phase", inherit=True) as inj:
+                pass
+
+        self.assertIsNone(inj._prefix)
+        self.assertIsNone(inj._chunks)
+
+    def test_sampling_is_disabled(self):
+        recorder = TraceRecorder(sample_rate=0)
+        self.start_recording(recorder)
+
+        with static_injector("phase"):
+            pass
+
+        self.assertEqual(recorder.events(), [])
+
+    def test_chrome_trace(self):
+        self.record_operation()
+        trace = self.recorder.to_chrome_trace()
+
+        self.assertEqual(len(trace['traceEvents']), 3)
+        event = trace['traceEvents'][-1]
+        self.assertEqual(event['name'], "operation")
+        self.assertEqual(event['ph'], "X")
+        self.assertEqual(event['dur'], 10 * 10 ** 6)
+        self.assertEqual(event['pid'], os.getpid())
+        self.assertEqual(event['tid'], threading.current_thread().ident)
+        self.assertEqual(event['args'], {'prefix': "oid | operation | "})
+
+    def test_speedscope(self):
+        self.record_operation()
+        profile = self.recorder.to_speedscope("job")
+
+        self.assertEqual(profile['name'], "job")
+        self.assertEqual(profile['shared']['frames'],
+                         [{'name': "phase"}, {'name': "operation"}])
+        self.assertEqual(len(profile['profiles']), 1)
+
+        events = profile['profiles'][0]['events']
+        start = 1420070400 * 10 ** 6
+        self.assertEqual(
+            [(x['type'], x['frame'], x['at'] - start) for x in events],
+            [
+                ("O", 1, 0),
+                ("O", 0, 1 * 10 ** 6),
+                ("O", 0, 3 * 10 ** 6),
+                ("C", 0, 6 * 10 ** 6),
+                ("C", 0, 6 * 10 ** 6),
+                ("C", 1, 10 * 10 ** 6),
+            ])
+
+    def test_speedscope_of_instant_scopes(self):
+        with freeze_time("2015-01-01 00:00:00"):
+            with hybrid_injector("operation", itertools.repeat("oid")):
+                with static_injector("phase", inherit=True):
+                    with static_injector("step", inherit=True):
+                        pass
+
+        profile = self.recorder.to_speedscope()
+        self.assertEqual(profile['shared']['frames'],
+                         [{'name': "step"}, {'name': "phase"},
+                          {'name': "operation"}])
+
+        events = profile['profiles'][0]['events']
+        self.assertEqual(
+            [(x['type'], x['frame']) for x in events],
+            [
+                ("O", 2),
+                ("O", 1),
+                ("O", 0),
+                ("C", 0),
+                ("C", 1),
+                ("C", 2),
+            ])
+        self.assertEqual(len(set(x['at'] for x in events)), 1)
+
+    def test_inner_scopes_do_not_end_after_outer_ones(self):
+        outer = Mock(chunks=("operation", ), prefix="operation | ",
+                     enter_time=0.6e-6)
+        inner = Mock(chunks=("operation", "phase", ),
+                     prefix="operation | phase | ", enter_time=1.0e-6)
+
+        scope = Mock(trace_key=0)
+        scope.name = None
+
+        with patch('time.time', return_value=2.0e-6):
+            for injector in [inner, outer, ]:
+                self.recorder.scope_exited(scope, injector, None)
+
+        inner, outer = self.recorder.events()
+        self.assertLessEqual(outer.start, inner.start)
+        self.assertLessEqual(inner.start + inner.duration,
+                             outer.start + outer.duration)
+
+    def test_dump(self):
+        self.record_operation()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        path = os.path.join(directory, "trace.json")
+        self.recorder.dump_chrome_trace(path)
+
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)['traceEvents']), 3)
+
+        path = os.path.join(directory, "speedscope.json")
+        self.recorder.dump_speedscope(path)
+
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)['profiles']), 1)
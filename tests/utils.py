@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import os
+import signal
+import threading
+import time
+import unittest
+
 import mock
 
+from contextlib import contextmanager
 from functools import wraps
 
 from isotopic_logging.concurrency import threadsafe_iter
@@ -39,3 +46,91 @@ def patch_default_generator(call):
             patcher.stop()
 
     return decorator
+
+
+skip_unless_fork_hooks = unittest.skipUnless(
+    hasattr(os, 'fork') and hasattr(os, 'register_at_fork'),
+    "fork hooks are not supported by this platform")
+
+
+@contextmanager
+def concurrent_load(iterator, threads_count=8):
+    """
+    Keep calling ``next`` on given iterator from several threads until exit
+    from context.
+    """
+    stopped = threading.Event()
+
+    def worker():
+        while not stopped.is_set():
+            next(iterator)
+
+    threads = [threading.Thread(target=worker) for x in range(threads_count)]
+
+    for t in threads:
+        t.start()
+
+    try:
+        yield
+    finally:
+        stopped.set()
+
+        for t in threads:
+            t.join()
+
+
+def run_in_child_process(target, timeout=10):
+    """
+    Fork current process and return list of strings returned by target called
+    within child process. Return `None` if child fails or does not finish in
+    time, e.g. due to a deadlock.
+
+    Output of target must fit into a buffer of a pipe.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        code = 1
+
+        try:
+            os.close(read_fd)
+            os.write(write_fd, "\n".join(target()).encode('utf-8'))
+            code = 0
+        finally:
+            os._exit(code)
+
+    os.close(write_fd)
+
+    try:
+        deadline = time.time() + timeout
+
+        while True:
+            finished, status = os.waitpid(pid, os.WNOHANG)
+
+            if finished:
+                break
+
+            if time.time() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                return None
+
+            time.sleep(0.01)
+
+        if status != 0:
+            return None
+
+        chunks = []
+
+        while True:
+            chunk = os.read(read_fd, 4096)
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+
+        return b"".join(chunks).decode('utf-8').split("\n")
+    finally:
+        os.close(read_fd)